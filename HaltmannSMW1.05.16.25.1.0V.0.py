@@ -10,6 +10,7 @@ PLAYER_JUMP_VELOCITY = -15
 PLAYER_SPEED = 5
 ENEMY_SPEED = 1.5
 MUSHROOM_SPEED = 2
+TILE_PAD = 8 # Empty tiles bordering the grid, entities die before leaving it, so reads skip bounds checks
 
 # --- Palette ---
 SKY_BLUE = (135, 206, 250)
@@ -103,25 +104,53 @@ class FontManager:
             text_rect.topleft = position
         surface.blit(text_surface, text_rect)
 
+# Byte translation table: tile code -> 1 if solid (Solid, Hit Question, Brick - small player can't pass)
+SOLID_TABLE = bytes(1 if chr(code) in "SQB" else 0 for code in range(256))
+
 class Level:
-    """Represents the game level, including tilemap and drawing."""
+    """Represents the game level, including tilemap and drawing.
+
+    Tiles live in one flat bytearray of tile codes, row-major, with TILE_PAD
+    empty tiles around the level. A parallel bytearray holds 1 for solid
+    cells so collision checks are a single index into it.
+    """
     def __init__(self, tilemap_str_list):
-        self.tilemap = [list(row) for row in tilemap_str_list] # Mutable list of lists
-        self.rows = len(self.tilemap)
-        self.cols = len(self.tilemap[0])
+        self.rows = len(tilemap_str_list)
+        self.cols = max((len(row) for row in tilemap_str_list), default=0)
+        self.stride = self.cols + 2 * TILE_PAD
+        self.tiles = bytearray(b" ") * (self.stride * (self.rows + 2 * TILE_PAD))
+        for y, row in enumerate(tilemap_str_list):
+            start = self.cell_index(0, y)
+            self.tiles[start:start + len(row)] = row.encode("latin-1")
+        self.solid = self.tiles.translate(SOLID_TABLE)
         self.width = self.cols * TILE_SIZE
         self.height = self.rows * TILE_SIZE
 
+    def cell_index(self, grid_x: int, grid_y: int) -> int:
+        """Index of a grid position in the padded tile arrays."""
+        return (grid_y + TILE_PAD) * self.stride + grid_x + TILE_PAD
+
+    def row(self, grid_y: int) -> str:
+        """The tile characters of one row."""
+        start = self.cell_index(0, grid_y)
+        return self.tiles[start:start + self.cols].decode("latin-1")
+
     def get_tile(self, grid_x: int, grid_y: int) -> str:
         """Gets the tile character at a grid position."""
         if 0 <= grid_y < self.rows and 0 <= grid_x < self.cols:
-            return self.tilemap[grid_y][grid_x]
+            return chr(self.tiles[self.cell_index(grid_x, grid_y)])
         return " " # Return empty space for out-of-bounds
 
-    def is_solid(self, grid_x: int, grid_y: int) -> bool:
-        """Checks if a tile is solid for collision."""
-        tile = self.get_tile(grid_x, grid_y)
-        return tile in ['S', 'Q', 'B'] # Solid, Hit Question, Brick (small player can't pass)
+    def set_tile(self, grid_x: int, grid_y: int, tile: str):
+        """Changes a tile and updates its solidity."""
+        if 0 <= grid_y < self.rows and 0 <= grid_x < self.cols:
+            idx = self.cell_index(grid_x, grid_y)
+            self.tiles[idx] = ord(tile)
+            self.solid[idx] = SOLID_TABLE[self.tiles[idx]]
+
+    def is_solid(self, grid_x: int, grid_y: int) -> int:
+        """Checks if a tile is solid for collision. Nonzero means solid."""
+        return self.solid[(grid_y + TILE_PAD) * self.stride + grid_x + TILE_PAD]
 
     def is_breakable_brick(self, grid_x: int, grid_y: int) -> bool:
         """Checks if a tile is a breakable brick."""
@@ -134,7 +163,7 @@ class Level:
         spawn_y = (grid_y - 1) * TILE_SIZE # Item spawns above the block
 
         if tile == '?':
-            self.tilemap[grid_y][grid_x] = 'Q' # Change to hit question block
+            self.set_tile(grid_x, grid_y, 'Q') # Change to hit question block
             # Determine item to spawn
             if player_power_up == "small": # Prioritize mushroom if small
                 item_type = "mushroom"
@@ -150,7 +179,7 @@ class Level:
 
         elif tile == 'B':
             if player_power_up == "big":
-                self.tilemap[grid_y][grid_x] = '.' # Break the brick
+                self.set_tile(grid_x, grid_y, '.') # Break the brick
                 # TODO: Add particle effect or score for breaking bricks
                 return True # Brick broken
             else:
@@ -165,9 +194,10 @@ class Level:
         start_col = cam_x // TILE_SIZE
         end_col = start_col + (WIDTH // TILE_SIZE) + 2 # Draw a bit extra for smooth scrolling
 
-        for y, row_list in enumerate(self.tilemap):
+        for y in range(self.rows):
+            row = self.row(y)
             for x in range(max(0, start_col), min(self.cols, end_col)):
-                cell = row_list[x]
+                cell = row[x]
                 rect = pygame.Rect(x * TILE_SIZE - cam_x, y * TILE_SIZE, TILE_SIZE, TILE_SIZE)
                 if cell == "S":
                     pygame.draw.rect(surface, BROWN, rect)
@@ -608,8 +638,8 @@ class Game:
         """Finds all spawn points for a given character in the current level's tilemap."""
         spawns = []
         if not self.level: return spawns
-        for y, row in enumerate(self.level.tilemap):
-            for x, cell in enumerate(row):
+        for y in range(self.level.rows):
+            for x, cell in enumerate(self.level.row(y)):
                 if cell == char_to_find:
                     spawns.append((x, y))
         return spawns
@@ -660,13 +690,13 @@ class Game:
             coin.vel_y = 0 # No pop
             coin.lifetime = float('inf') # Persist until collected
             self.items.add(coin)
-            self.level.tilemap[cy][cx] = '.' # Remove 'C' from map once item is created
+            self.level.set_tile(cx, cy, '.') # Remove 'C' from map once item is created
         
         mushroom_spawns = self._find_spawn_points("M") # For testing direct mushrooms
         for mx, my in mushroom_spawns:
             mushroom = Item(mx * TILE_SIZE, my*TILE_SIZE, "mushroom", self.level)
             self.items.add(mushroom)
-            self.level.tilemap[my][mx] = '.'
+            self.level.set_tile(mx, my, '.')
 
         self.cam_x = 0
         self.player.on_goal = False # Reset goal flag
@@ -1,16 +1,61 @@
 import pygame
 import sys
+import os
+import argparse
+import re
+import time
+import hashlib
+import mmap
+import struct
+import tempfile
+import threading
+import contextlib
+from collections import OrderedDict
+
+try:
+    import numpy # Optional, only needed for the "numpy" tile renderer
+except ImportError:
+    numpy = None
 import math # For potential future use, e.g., animations
 
 # --- Configuration ---
 WIDTH, HEIGHT = 800, 600
-FPS = 60
+FPS = 60 # Simulation rate, the game always steps at exactly this rate
+MAX_SIM_STEPS = 5 # Catch-up cap: simulation steps per rendered frame before time is dropped
 TILE_SIZE = 30
 GRAVITY = 0.7
 PLAYER_JUMP_VELOCITY = -15
 PLAYER_SPEED = 5
 ENEMY_SPEED = 1.5
 MUSHROOM_SPEED = 2
+SUBPIXEL_SHIFT = 4 # Fixed-point physics works in 1/16 pixel units, like the original SMW
+SUBPIXELS = 1 << SUBPIXEL_SHIFT
+TILE_CHUNK_COLS = 16 # Columns per pre-rendered tile chunk surface
+TILE_CHUNK_ROWS = 16 # Rows per pre-rendered tile chunk surface
+TILE_CHUNK_KEEP = 2 # Chunk columns either side of the viewport whose baked surfaces draw() keeps
+TILE_PAD = 8 # Empty tiles bordering the grid, entities die before leaving it, so reads skip bounds checks
+TEXT_CACHE_BUDGET = 2 * 1024 * 1024 # Bytes of rendered text surfaces FontManager may keep
+OVERWORLD_NODE_RADIUS = 20
+SPATIAL_CELL_TILES = 2 # Cell edge, in tiles, of the sprite spatial hash
+# Activation regions, in pixels beyond the camera's left and right edges. Placed enemies and
+# items wake when their spawn column scrolls within the wake margin and despawn back to their
+# spawn tile once they are further out than the sleep margin.
+ACTIVATION_WAKE_MARGIN = TILE_SIZE * 2
+ACTIVATION_SLEEP_MARGIN = TILE_SIZE * 8
+TILE_RENDERERS = ("chunks", "numpy") # Level backends, chosen with --tile-renderer
+# How the WIDTH x HEIGHT logical frame reaches the window, chosen with --display:
+# "native" draws straight into an 800x600 window, "scaled" lets SDL scale it (pygame.SCALED),
+# "integer" blits it at the largest whole-number scale that fits --window, letterboxed.
+DISPLAY_MODES = ("native", "scaled", "integer")
+ENEMY_ENGINES = ("sprites", "numpy") # Enemy simulation, chosen with --enemy-engine
+LEVEL_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".level_cache") # Compiled levels
+# Level streaming (--stream): levels are paged in by STREAM_CHUNK_COLS wide column chunks, with a window of
+# STREAM_WINDOW_CHUNKS resident around the player and the STREAM_CACHE_CHUNKS last evicted ones kept in memory.
+# The window has to span the sleep region on both sides of the camera, see Game._stream_level.
+STREAM_CHUNK_COLS = 64
+STREAM_WINDOW_CHUNKS = 4
+STREAM_CACHE_CHUNKS = 8
+PREFETCH_LEVELS = 2 # Levels the background loader keeps built ahead of being entered
 
 # --- Palette ---
 SKY_BLUE = (135, 206, 250)
@@ -40,7 +85,7 @@ OVERWORLD = 5 # New state for level selection
 
 # --- World and Level Definitions ---
 # 'S': Solid, 'P': Player, 'E': Enemy, '?': Question (Coin/Mushroom),
-# 'B': Breakable Brick, 'C': Coin (direct), 'G': Goal
+# 'B': Breakable Brick, 'C': Coin (direct), 'G': Goal, 'K': Checkpoint, 'X': Kill zone
 # 'M': Mushroom (direct - for testing, usually from '?')
 worlds = {
     1: {
@@ -148,181 +193,1427 @@ overworld_nodes = {
 
 
 class FontManager:
-    """Handles loading and rendering fonts."""
-    def __init__(self):
+    """Handles loading and rendering fonts.
+
+    Rendered strings are kept in an LRU cache keyed by (text, color, size) and
+    bounded to TEXT_CACHE_BUDGET bytes. Digits come from a per-size glyph atlas,
+    so changing numbers such as "Score: {n}" never rasterise new text.
+    """
+    DIGITS = "0123456789"
+    _digit_runs = re.compile(r"([0-9]+)") # ASCII only, the atlas has no other digits
+
+    def __init__(self, cache_budget=TEXT_CACHE_BUDGET):
         self.default_font_small = pygame.font.Font(None, 36)
         self.default_font_medium = pygame.font.Font(None, 48)
         self.default_font_large = pygame.font.Font(None, 72)
 
-    def render(self, surface, text, position, color, size="small", center=False):
-        font = self.default_font_small
+        self.cache_budget = cache_budget
+        self._text_cache = OrderedDict() # (text, color, size) -> Surface, oldest first
+        self._text_cache_bytes = 0
+        self._glyph_atlases = {} # (color, size) -> (atlas Surface, {digit: area Rect})
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.glyph_hits = 0
+        self.glyph_misses = 0
+
+    def _font(self, size):
         if size == "large":
-            font = self.default_font_large
+            return self.default_font_large
         elif size == "medium":
-            font = self.default_font_medium
-        
+            return self.default_font_medium
+        return self.default_font_small
+
+    def _rasterise(self, font, text, color):
         text_surface = font.render(text, True, color)
-        text_rect = text_surface.get_rect()
+        if pygame.display.get_surface():
+            text_surface = text_surface.convert_alpha()
+        return text_surface
+
+    def _cached_text(self, text, color, size):
+        """Returns the rendered surface for text, rasterising it only on a cache miss."""
+        key = (text, color, size)
+        text_surface = self._text_cache.get(key)
+        if text_surface is not None:
+            self._text_cache.move_to_end(key)
+            self.cache_hits += 1
+            return text_surface
+
+        self.cache_misses += 1
+        text_surface = self._rasterise(self._font(size), text, color)
+        self._text_cache[key] = text_surface
+        self._text_cache_bytes += text_surface.get_bytesize() * text_surface.get_width() * text_surface.get_height()
+        while self._text_cache_bytes > self.cache_budget and len(self._text_cache) > 1:
+            _, evicted = self._text_cache.popitem(last=False)
+            self._text_cache_bytes -= evicted.get_bytesize() * evicted.get_width() * evicted.get_height()
+        return text_surface
+
+    def _glyph_atlas(self, color, size):
+        """Returns the digit atlas for a color and size, building it on first use."""
+        key = (color, size)
+        atlas = self._glyph_atlases.get(key)
+        if atlas is not None:
+            self.glyph_hits += 1
+            return atlas
+
+        self.glyph_misses += 1
+        font = self._font(size)
+        glyphs = [self._rasterise(font, digit, color) for digit in self.DIGITS]
+        atlas_surface = pygame.Surface((sum(g.get_width() for g in glyphs), max(g.get_height() for g in glyphs)), pygame.SRCALPHA)
+        if pygame.display.get_surface():
+            atlas_surface = atlas_surface.convert_alpha()
+        atlas_surface.fill((0, 0, 0, 0))
+        areas = {}
+        x = 0
+        for digit, glyph in zip(self.DIGITS, glyphs):
+            atlas_surface.blit(glyph, (x, 0))
+            areas[digit] = pygame.Rect(x, 0, glyph.get_width(), glyph.get_height())
+            x += glyph.get_width()
+        atlas = (atlas_surface, areas)
+        self._glyph_atlases[key] = atlas
+        return atlas
+
+    def cache_stats(self) -> dict:
+        return {
+            "hits": self.cache_hits, "misses": self.cache_misses,
+            "glyph_hits": self.glyph_hits, "glyph_misses": self.glyph_misses,
+            "entries": len(self._text_cache), "bytes": self._text_cache_bytes,
+        }
+
+    def render(self, surface, text, position, color, size="small", center=False):
+        color = tuple(color)
+        segments = [segment for segment in self._digit_runs.split(text) if segment]
+        if not segments or (len(segments) == 1 and segments[0][0] not in self.DIGITS): # Empty or no digits
+            text_surface = self._cached_text(text, color, size)
+            text_rect = text_surface.get_rect()
+            if center:
+                text_rect.center = position
+            else:
+                text_rect.topleft = position
+            surface.blit(text_surface, text_rect)
+            return text_rect
+
+        # Mixed text: lay out cached words and atlas digits, then blit them in place
+        pieces = [] # (surface, area or None)
+        atlas_surface, areas = (None, None)
+        for segment in segments:
+            if segment[0] in self.DIGITS:
+                if atlas_surface is None:
+                    atlas_surface, areas = self._glyph_atlas(color, size)
+                pieces.extend((atlas_surface, areas[digit]) for digit in segment)
+            else:
+                pieces.append((self._cached_text(segment, color, size), None))
+
+        width = sum(area.width if area else piece.get_width() for piece, area in pieces)
+        height = max(area.height if area else piece.get_height() for piece, area in pieces)
+        text_rect = pygame.Rect(0, 0, width, height)
         if center:
             text_rect.center = position
         else:
             text_rect.topleft = position
-        surface.blit(text_surface, text_rect)
+
+        x = text_rect.x
+        for piece, area in pieces:
+            surface.blit(piece, (x, text_rect.y), area)
+            x += area.width if area else piece.get_width()
+        return text_rect
+
+class DirtyRectRenderer:
+    """Presents only the screen regions that changed instead of flipping the whole display."""
+    def __init__(self, screen):
+        self.screen_rect = screen.get_rect()
+        self._prev_rects = [] # Regions drawn last frame, they must be repainted this frame too
+        self.pixels_last_frame = 0
+        self.pixels_total = 0
+        self.frames = 0
+
+    def _count(self, pixels):
+        self.pixels_last_frame = pixels
+        self.pixels_total += pixels
+        self.frames += 1
+
+    def present_full(self):
+        """Flips the whole display, e.g. after a scene change or camera movement."""
+        pygame.display.flip()
+        self._prev_rects = []
+        self._count(self.screen_rect.width * self.screen_rect.height)
+
+    def present_none(self):
+        """Nothing changed on screen, so nothing is pushed."""
+        self._count(0)
+
+    def present(self, rects):
+        """Pushes this frame's changed regions plus the ones drawn over last frame."""
+        current = [rect.clip(self.screen_rect) for rect in rects]
+        current = [rect for rect in current if rect.width and rect.height]
+        dirty = self._prev_rects + current
+        if dirty:
+            pygame.display.update(dirty)
+        self._prev_rects = current
+        self._count(sum(rect.width * rect.height for rect in dirty))
+
+    def average_pixels(self) -> float:
+        return self.pixels_total / self.frames if self.frames else 0.0
+
+class SpriteImageRegistry:
+    """Flyweight store of sprite images keyed by (kind, size, color).
+
+    Each image is built once, converted to the display format and then shared
+    by every sprite that uses it, so sprites must never draw onto their image.
+    """
+    def __init__(self):
+        self._images = {}
+
+    def get(self, kind: str, size: tuple, color) -> pygame.Surface:
+        key = (kind, tuple(size), tuple(color))
+        image = self._images.get(key)
+        if image is None:
+            image = self._build(kind, size, color)
+            self._images[key] = image
+        return image
+
+    def _build(self, kind, size, color):
+        width, height = size
+        image = pygame.Surface((width, height))
+        converted = pygame.display.get_surface() is not None
+        if converted:
+            image = image.convert()
+
+        if kind == "block":
+            image.fill(color)
+        elif kind == "mushroom":
+            image.fill(color)
+            # Simple eyes for mushroom
+            eye_radius = width // 8
+            left_eye = (width//2 - width//4, height//2 - height//5)
+            right_eye = (width//2 + width//4, height//2 - height//5)
+            pygame.draw.circle(image, WHITE, left_eye, eye_radius)
+            pygame.draw.circle(image, WHITE, right_eye, eye_radius)
+            pygame.draw.circle(image, BLACK, left_eye, eye_radius//2)
+            pygame.draw.circle(image, BLACK, right_eye, eye_radius//2)
+        elif kind == "coin":
+            image.fill(BLACK) # Fill with colorkey color first
+            pygame.draw.circle(image, color, (width // 2, height // 2), width // 2)
+            pygame.draw.circle(image, GOLD, (width // 2, height // 2), (width * 2) // 5, width=1) # Outline
+            # Mostly transparent and never changes, so RLE encoding speeds up its blits
+            image.set_colorkey(BLACK, pygame.RLEACCEL if converted else 0)
+        else:
+            raise ValueError(f"Unknown sprite image kind: {kind}")
+        return image
+
+sprite_images = SpriteImageRegistry()
+
+class PhysicsRules:
+    """Movement constants in the units entity velocities are stored in.
+
+    "float" keeps velocities in pixels as floats, rounded into the Rect on every move.
+    "fixed" keeps integer velocities in 1/SUBPIXELS pixel units and carries the
+    sub-pixel remainder per entity, so runs are bit-exact on every machine.
+    """
+    def __init__(self, fixed_point: bool):
+        self.fixed_point = fixed_point
+        scale = SUBPIXELS if fixed_point else 1
+        convert = round if fixed_point else (lambda value: value)
+        self.scale = scale # Velocity units per pixel
+        self.gravity = convert(GRAVITY * scale)
+        self.coin_gravity = convert(GRAVITY * 0.5 * scale)
+        self.terminal_velocity = TILE_SIZE * scale
+        self.player_speed = PLAYER_SPEED * scale
+        self.jump_velocity = PLAYER_JUMP_VELOCITY * scale
+        self.stomp_bounce = convert(PLAYER_JUMP_VELOCITY * 0.6 * scale)
+        self.enemy_speed = convert(ENEMY_SPEED * scale)
+        self.mushroom_speed = MUSHROOM_SPEED * scale
+        self.item_pop_velocity = -5 * scale
+
+PHYSICS_MODES = {"float": PhysicsRules(False), "fixed": PhysicsRules(True)} # Chosen with --physics
+
+class SpatialHash:
+    """Buckets sprites by the tile-aligned grid cells their rect overlaps.
+
+    Serves both viewport culling and collision broadphase: a query only looks
+    at sprites sharing a cell with the query rect. Results come back in the
+    order sprites were added, which is also their sprite group order.
+    """
+    def __init__(self, cell_tiles=SPATIAL_CELL_TILES):
+        self.cell_size = cell_tiles * TILE_SIZE
+        self._cells = {} # (cell x, cell y) -> set of sprites
+        self._spans = {} # sprite -> (first cell x, first cell y, last cell x, last cell y)
+        self._order = {} # sprite -> add sequence number
+        self._next_order = 0
+        self.pairs_tested = 0 # Candidates handed to exact rect tests, reset by the caller
+
+    def _span(self, rect):
+        size = self.cell_size
+        return rect.left // size, rect.top // size, (rect.right - 1) // size, (rect.bottom - 1) // size
+
+    def _link(self, sprite, span):
+        self._spans[sprite] = span
+        for cell_y in range(span[1], span[3] + 1):
+            for cell_x in range(span[0], span[2] + 1):
+                self._cells.setdefault((cell_x, cell_y), set()).add(sprite)
+
+    def _unlink(self, sprite):
+        span = self._spans.pop(sprite, None)
+        if span is not None:
+            for cell_y in range(span[1], span[3] + 1):
+                for cell_x in range(span[0], span[2] + 1):
+                    self._cells[(cell_x, cell_y)].discard(sprite)
+
+    def add(self, sprite):
+        self._order[sprite] = self._next_order
+        self._next_order += 1
+        self._link(sprite, self._span(sprite.rect))
+        sprite.index = self
+
+    def remove(self, sprite):
+        self._unlink(sprite)
+        self._order.pop(sprite, None)
+        sprite.index = None
+
+    def move(self, sprite):
+        """Re-buckets a sprite after it moved. Cheap when it stayed in the same cells."""
+        span = self._span(sprite.rect)
+        if self._spans.get(sprite) != span:
+            self._unlink(sprite)
+            self._link(sprite, span)
+
+    def clear(self):
+        for sprite in self._spans:
+            sprite.index = None
+        self._cells.clear()
+        self._spans.clear()
+        self._order.clear()
+
+    def query(self, rect) -> list:
+        """Sprites sharing a cell with rect, in add order. They may not overlap rect itself."""
+        first_x, first_y, last_x, last_y = self._span(rect)
+        found = set()
+        for cell_y in range(first_y, last_y + 1):
+            for cell_x in range(first_x, last_x + 1):
+                sprites = self._cells.get((cell_x, cell_y))
+                if sprites:
+                    found.update(sprites)
+        return sorted(found, key=self._order.__getitem__)
+
+    def collide(self, rect) -> list:
+        """Sprites overlapping rect, in add order."""
+        candidates = self.query(rect)
+        self.pairs_tested += len(candidates)
+        return [sprite for sprite in candidates if rect.colliderect(sprite.rect)]
+
+    def collide_any(self, rect):
+        """First sprite overlapping rect in add order, like spritecollideany, or None."""
+        candidates = self.query(rect)
+        for tested, sprite in enumerate(candidates, 1):
+            if rect.colliderect(sprite.rect):
+                self.pairs_tested += tested
+                return sprite
+        self.pairs_tested += len(candidates)
+        return None
+
+    def __len__(self):
+        return len(self._spans)
+
+class IndexedSprite(pygame.sprite.Sprite):
+    """Sprite that keeps its SpatialHash entry in step with its rect."""
+    def __init__(self):
+        super().__init__()
+        self.index = None # Set by SpatialHash.add
+        self.spawn_id = None # Game spawn record this sprite was woken from, None if it was spawned at runtime
+        self.sub_x = 0 # Sub-pixel remainder of the position in fixed-point physics, 0..SUBPIXELS-1
+        self.sub_y = 0
+        self.prev_pos = None # Position before the last simulation step, for render interpolation
+
+    def snapshot(self):
+        """Remembers the current position as the start of the next simulation step."""
+        self.prev_pos = self.rect.topleft
+
+    def lerp_pos(self, alpha: float) -> tuple:
+        """Position to draw at, alpha of the way from the previous step to the current one."""
+        if self.prev_pos is None or alpha >= 1.0:
+            return self.rect.topleft
+        prev_x, prev_y = self.prev_pos
+        return (round(prev_x + (self.rect.x - prev_x) * alpha),
+                round(prev_y + (self.rect.y - prev_y) * alpha))
+
+    def _sweep(self, dx, dy):
+        """Moves the rect by velocity (dx, dy) through the tile grid, x first.
+
+        Returns (x hit, y hit) as Level.sweep_x/sweep_y do. In fixed-point physics
+        the sub-pixel remainders carry over between steps and are cleared on
+        contact, and a rect resting exactly on the ground counts as landing even
+        when this step's fall was less than a pixel.
+        """
+        level = self.level
+        if not level.physics.fixed_point:
+            return level.sweep_x(self.rect, dx), level.sweep_y(self.rect, dy)
+
+        total = self.sub_x + dx
+        self.sub_x = total & (SUBPIXELS - 1)
+        x_hit = level.sweep_x(self.rect, total >> SUBPIXEL_SHIFT)
+        if x_hit is not None:
+            self.sub_x = 0 # Flush against the wall
+
+        total = self.sub_y + dy
+        self.sub_y = total & (SUBPIXELS - 1)
+        y_hit = level.sweep_y(self.rect, total >> SUBPIXEL_SHIFT)
+        if y_hit is None and dy > 0:
+            y_hit = level.resting_on(self.rect)
+        if y_hit is not None:
+            self.sub_y = 0
+        return x_hit, y_hit
+
+    def reindex(self):
+        if self.index is not None:
+            self.index.move(self)
+
+    def kill(self):
+        if self.index is not None:
+            self.index.remove(self)
+        super().kill()
+
+# --- Tile Types ---
+# Flag bits stored per tile code in TILE_FLAGS and per cell in Level.flags
+TILE_SOLID = 1
+TILE_BREAKABLE = 2
+TILE_BUMPABLE = 4
+TILE_COLLECTIBLE = 8
+
+# Navigation bits stored per cell in Level.nav, set on standable cells (empty, solid below)
+NAV_STANDABLE = 1
+NAV_LEDGE_LEFT = 2 # Stepping left would walk off the edge
+NAV_LEDGE_RIGHT = 4
+NAV_WALL_LEFT = 8 # Solid tile directly to the left
+NAV_WALL_RIGHT = 16
+
+class TileType:
+    """A kind of tile: its flag bits, how it is drawn and what happens when it is hit from below.
+
+    draw(surface, rect) and on_hit(level, grid_x, grid_y, player_power_up, game) -> bool
+    are both optional. trigger names the Trigger kind the level indexes for cells of this tile.
+    """
+    def __init__(self, code: str, flags: int = 0, draw=None, on_hit=None, trigger=None):
+        self.code = code
+        self.flags = flags
+        self.draw = draw
+        self.on_hit = on_hit
+        self.trigger = trigger
+
+# Trigger kinds, handled by Player._on_trigger
+TRIGGER_GOAL = "goal"
+TRIGGER_CHECKPOINT = "checkpoint"
+TRIGGER_WARP = "warp"
+TRIGGER_KILL = "kill"
+
+class Trigger:
+    """Something that happens when the player overlaps a cell. target is the warp destination tile."""
+    __slots__ = ("kind", "grid_x", "grid_y", "target")
+
+    def __init__(self, kind: str, grid_x: int, grid_y: int, target=None):
+        self.kind = kind
+        self.grid_x = grid_x
+        self.grid_y = grid_y
+        self.target = target
+
+TILE_TYPES = {} # Tile code -> TileType
+TILE_FLAGS = bytearray(256) # Tile code byte -> flag bits, also a bytes.translate table
+TRIGGER_TILES = {} # Tile code -> Trigger kind, for the tile types that have one
+
+def register_tile(tile_type: TileType):
+    """Adds a tile kind. Hot paths only ever see its flags, so new kinds cost nothing there."""
+    TILE_TYPES[tile_type.code] = tile_type
+    TILE_FLAGS[ord(tile_type.code)] = tile_type.flags
+    if tile_type.trigger:
+        TRIGGER_TILES[tile_type.code] = tile_type.trigger
+    else:
+        TRIGGER_TILES.pop(tile_type.code, None) # Re-registered without one
+
+def _draw_block(color):
+    def draw(surface, rect):
+        pygame.draw.rect(surface, color, rect)
+    return draw
+
+def _draw_coin_tile(surface, rect):
+    # Same look as the popped coin sprite, which is TILE_SIZE // 2 wide and centred on its tile
+    size = TILE_SIZE // 2
+    pygame.draw.circle(surface, YELLOW, rect.center, size // 2)
+    pygame.draw.circle(surface, GOLD, rect.center, (size * 2) // 5, width=1)
+
+def _draw_mushroom_tile(surface, rect):
+    pygame.draw.rect(surface, BRIGHT_RED, rect.inflate(-TILE_SIZE//3, -TILE_SIZE//3))
+
+def _draw_goal_tile(surface, rect):
+    pygame.draw.rect(surface, GREEN, rect) 
+    pygame.draw.circle(surface, WHITE, rect.center, TILE_SIZE // 3)
+
+def _draw_checkpoint_tile(surface, rect):
+    pygame.draw.rect(surface, WHITE, (rect.centerx - 2, rect.top, 4, rect.height)) # Pole
+    pygame.draw.polygon(surface, GOLD, [(rect.centerx + 2, rect.top + 2), (rect.right - 2, rect.top + 7), (rect.centerx + 2, rect.top + 12)])
+
+def _draw_kill_tile(surface, rect):
+    pygame.draw.rect(surface, BRIGHT_RED, rect)
+    pygame.draw.rect(surface, GOLD, rect.inflate(-TILE_SIZE // 2, -TILE_SIZE // 2))
+
+def _hit_question_block(level, grid_x, grid_y, player_power_up, game):
+    level.set_tile(grid_x, grid_y, 'Q') # Change to hit question block
+    item_type = "mushroom" if player_power_up == "small" else "coin"
+
+    new_item = Item(grid_x * TILE_SIZE, (grid_y - 1) * TILE_SIZE, item_type, level) # Spawns above the block
+    new_item.vel_y = level.physics.item_pop_velocity # Pop out effect
+    game.spawn_item(new_item) # Add to the sprite group and culling index
+    game.play_sound("bonk_block") # Sound for hitting a question block
+    return True
+
+def _hit_brick(level, grid_x, grid_y, player_power_up, game):
+    if player_power_up == "big":
+        level.set_tile(grid_x, grid_y, '.') # Break the brick
+        game.play_sound("break_brick") # Sound for breaking brick
+        # TODO: Add particle effect or score for breaking bricks
+        return True
+    game.play_sound("bonk_solid") # Small player bonks head
+    return False
+
+register_tile(TileType("S", TILE_SOLID, _draw_block(BROWN)))
+register_tile(TileType("?", TILE_BUMPABLE, _draw_block(GOLD), _hit_question_block))
+register_tile(TileType("Q", TILE_SOLID, _draw_block(LIGHT_BROWN))) # Hit question block, still solid
+register_tile(TileType("B", TILE_SOLID | TILE_BREAKABLE | TILE_BUMPABLE, _draw_block(BRICK_COLOR), _hit_brick))
+register_tile(TileType("C", TILE_COLLECTIBLE, _draw_coin_tile))
+register_tile(TileType("M", 0, _draw_mushroom_tile))
+register_tile(TileType("G", 0, _draw_goal_tile, trigger=TRIGGER_GOAL))
+register_tile(TileType("K", 0, _draw_checkpoint_tile, trigger=TRIGGER_CHECKPOINT))
+register_tile(TileType("X", 0, _draw_kill_tile, trigger=TRIGGER_KILL)) # Lava, spikes
+# Spawn marker code -> entity kind. Level ingest moves markers into per-kind spawn tables
+# and leaves SPAWN_CLEARED in their cells; Game creates the entities from the tables.
+SPAWN_TYPES = {"P": "player", "E": "enemy", "M": "mushroom"}
+SPAWN_CLEARED = "."
+
+def ingest_spawns(tiles, stride: int) -> dict:
+    """Collects and clears every spawn marker of a padded tile plane in one scan.
+
+    Returns {kind: [(grid_x, grid_y), ...]} in row-major order, with an entry
+    for every kind in SPAWN_TYPES. The scan is a single regex pass over the
+    plane however many spawn kinds there are; only marker cells are touched.
+    """
+    spawns = {kind: [] for kind in SPAWN_TYPES.values()}
+    markers = re.compile(b"[" + re.escape("".join(SPAWN_TYPES).encode("latin-1")) + b"]")
+    cleared = ord(SPAWN_CLEARED)
+    for match in markers.finditer(tiles):
+        idx = match.start()
+        grid_y, grid_x = divmod(idx, stride)
+        spawns[SPAWN_TYPES[chr(tiles[idx])]].append((grid_x - TILE_PAD, grid_y - TILE_PAD))
+        tiles[idx] = cleared
+    return spawns
 
 class Level:
-    """Represents the game level, including tilemap and drawing."""
-    def __init__(self, tilemap_str_list):
-        self.tilemap = [list(row) for row in tilemap_str_list] # Mutable list of lists
-        self.rows = len(self.tilemap)
-        self.cols = len(self.tilemap[0]) if self.rows > 0 else 0
+    """Represents the game level, including tilemap and drawing.
+
+    Tiles live in one flat bytearray of tile codes, row-major, with TILE_PAD
+    empty tiles around the level. A parallel bytearray holds each cell's
+    TILE_FLAGS bits so collision checks are a single index into it.
+    The planes may cover only some of the level's columns (see StreamedLevel);
+    col_offset maps a level grid x to its column in them.
+    """
+    streamed = False # StreamedLevel pages its columns in with stream()
+    track_changes = False # Whether set_tile records changed_tiles, only a dirty-rect renderer reads them
+
+    def __init__(self, tilemap_str_list, tile_renderer="chunks", physics="float"):
+        rows = len(tilemap_str_list)
+        cols = max((len(row) for row in tilemap_str_list), default=0)
+        stride = cols + 2 * TILE_PAD
+        # Short rows are left padded with empty space, so every row is cols wide
+        tiles = bytearray(b" ") * (stride * (rows + 2 * TILE_PAD))
+        for y, row in enumerate(tilemap_str_list):
+            start = (y + TILE_PAD) * stride + TILE_PAD
+            tiles[start:start + len(row)] = row.encode("latin-1")
+        spawns = ingest_spawns(tiles, stride)
+        self._attach(cols, rows, tiles, tiles.translate(TILE_FLAGS), None, spawns, tile_renderer, physics)
+
+    @classmethod
+    def from_planes(cls, cols, rows, tiles, flags, nav, spawns, tile_renderer="chunks", physics="float",
+                    triggers=None):
+        """Builds a level around existing padded planes, e.g. the memory-mapped ones of a compiled level."""
+        level = cls.__new__(cls)
+        level._attach(cols, rows, tiles, flags, nav, spawns, tile_renderer, physics, triggers)
+        return level
+
+    def _attach(self, cols, rows, tiles, flags, nav, spawns, tile_renderer, physics, triggers=None):
+        """Sets up the level around its tile and flag planes.
+
+        nav is derived when None. spawns are ingested from the plane when None, which must then be writable.
+        triggers, keyed like self.triggers, are indexed from the plane when None.
+        """
+        self.rows = rows
+        self.cols = cols
+        self.stride = len(tiles) // (rows + 2 * TILE_PAD)
+        self.col_offset = TILE_PAD # Added to a grid x to get its column in the planes
+        self.first_resident_col = 0 # Grid columns [first, last) the planes hold
+        self.last_resident_col = self.stride - 2 * TILE_PAD
+        self.tiles = tiles
+        self.flags = flags
+        if nav is None:
+            self.nav = bytearray(len(tiles)) # NAV_* bits per cell, for enemy turn-around decisions
+            self._refresh_nav(0, cols, 0, rows)
+        else:
+            self.nav = nav
+        if triggers is None:
+            self.triggers = {} # grid_y * cols + grid_x -> Trigger
+            self._index_triggers(self.first_resident_col, self.last_resident_col)
+        else:
+            self.triggers = triggers
+        # Entity kind -> [(grid_x, grid_y), ...] in row-major order, markers already cleared from the plane
+        self.spawns = spawns if spawns is not None else ingest_spawns(tiles, self.stride)
         self.width = self.cols * TILE_SIZE
         self.height = self.rows * TILE_SIZE
+        self.changed_tiles = [] # World rects of tiles changed since the renderer last looked, see track_changes
+        self.journal = [] # (grid_x, grid_y, previous tile) of every set_tile since load, see rollback()
+        self.physics = PHYSICS_MODES[physics] # Movement units and constants for entities in this level
+
+        # Static tile layer, baked into TILE_CHUNK_COLS x TILE_CHUNK_ROWS surfaces
+        self.chunk_width = TILE_CHUNK_COLS * TILE_SIZE
+        self.chunk_height = TILE_CHUNK_ROWS * TILE_SIZE
+        self.chunk_cols = (self.cols + TILE_CHUNK_COLS - 1) // TILE_CHUNK_COLS
+        self.chunk_rows = (self.rows + TILE_CHUNK_ROWS - 1) // TILE_CHUNK_ROWS
+        self._chunks = {} # (chunk x, chunk y) -> pre-rendered pygame.Surface
+        self._drawn_chunk_cols = None # (first, last) chunk columns of the last draw(), see TILE_CHUNK_KEEP
+        self._raster = NumpyTileRasteriser(self) if tile_renderer == "numpy" else None
+
+    def close(self):
+        """Unmaps the planes of a compiled level. The level can't be used afterwards."""
+        for plane in (self.tiles, self.flags, self.nav):
+            if isinstance(plane, mmap.mmap):
+                plane.close()
+
+    def _index_triggers(self, first_col: int, last_col: int):
+        """Registers the triggers implied by the tile codes in columns [first_col, last_col)."""
+        for grid_y in range(self.rows):
+            row = self.row(grid_y, first_col, last_col)
+            for code, kind in TRIGGER_TILES.items():
+                offset = row.find(code)
+                while offset != -1:
+                    grid_x = first_col + offset
+                    self.triggers[grid_y * self.cols + grid_x] = Trigger(kind, grid_x, grid_y)
+                    offset = row.find(code, offset + 1)
+
+    def cell_index(self, grid_x: int, grid_y: int) -> int:
+        """Index of a grid position in the padded tile arrays."""
+        return (grid_y + TILE_PAD) * self.stride + grid_x + self.col_offset
+
+    def row(self, grid_y: int, first_col: int = 0, last_col: int = None) -> str:
+        """The tile characters of one row, or of its columns [first_col, last_col)."""
+        if last_col is None: last_col = self.cols
+        start = self.cell_index(first_col, grid_y)
+        return self.tiles[start:start + last_col - first_col].decode("latin-1")
 
     def get_tile(self, grid_x: int, grid_y: int) -> str:
         """Gets the tile character at a grid position."""
         if 0 <= grid_y < self.rows and 0 <= grid_x < self.cols:
-            return self.tilemap[grid_y][grid_x]
+            return chr(self.tiles[self.cell_index(grid_x, grid_y)])
         return " " # Return empty space for out-of-bounds
 
-    def is_solid(self, grid_x: int, grid_y: int) -> bool:
-        """Checks if a tile is solid for collision."""
-        tile = self.get_tile(grid_x, grid_y)
-        # 'Q' is a hit question block, still solid.
-        return tile in ['S', 'Q', 'B']
-
-    def is_breakable_brick(self, grid_x: int, grid_y: int) -> bool:
-        """Checks if a tile is a breakable brick."""
-        return self.get_tile(grid_x, grid_y) == 'B'
-
-    def hit_block(self, grid_x: int, grid_y: int, player_power_up: str, game_items_group: pygame.sprite.Group, game):
-        """Handles player hitting a block from below. Items are added to game_items_group."""
-        tile = self.get_tile(grid_x, grid_y)
-        block_center_x = grid_x * TILE_SIZE + TILE_SIZE // 2
-        spawn_y = (grid_y - 1) * TILE_SIZE # Item spawns above the block
-
-        if tile == '?':
-            self.tilemap[grid_y][grid_x] = 'Q' # Change to hit question block
-            item_type = "mushroom" if player_power_up == "small" else "coin"
-            
-            new_item = Item(block_center_x - TILE_SIZE // 2, spawn_y, item_type, self)
-            new_item.vel_y = -5 # Pop out effect
-            game_items_group.add(new_item) # Add to the sprite group
-            game.play_sound("bonk_block") # Sound for hitting a question block
-            return True 
-
-        elif tile == 'B':
-            if player_power_up == "big":
-                self.tilemap[grid_y][grid_x] = '.' # Break the brick
-                game.play_sound("break_brick") # Sound for breaking brick
-                # TODO: Add particle effect or score for breaking bricks
-                return True 
-            else:
-                game.play_sound("bonk_solid") # Small player bonks head
-                return False 
-        return False
+    def set_tile(self, grid_x: int, grid_y: int, tile: str):
+        """Changes a tile, updates its flags and invalidates the chunk it was baked into.
+
+        The change is journaled, the level as loaded stays recoverable with rollback().
+        """
+        if 0 <= grid_y < self.rows and 0 <= grid_x < self.cols:
+            self.journal.append((grid_x, grid_y, self.get_tile(grid_x, grid_y)))
+            self._write_tile(grid_x, grid_y, tile)
+
+    def rollback(self):
+        """Undoes every journaled tile change, newest first, restoring the level as it was loaded.
+
+        Costs one tile write per change. Only the chunks holding changed tiles are invalidated,
+        every other baked chunk stays valid.
+        """
+        journal = self.journal
+        while journal:
+            grid_x, grid_y, tile = journal.pop()
+            self._write_tile(grid_x, grid_y, tile)
+
+    def _write_tile(self, grid_x: int, grid_y: int, tile: str):
+        """Stores a tile and keeps flags, navigation, triggers and baked chunks in step with it."""
+        idx = self.cell_index(grid_x, grid_y)
+        self.tiles[idx] = ord(tile)
+        self.flags[idx] = TILE_FLAGS[self.tiles[idx]]
+        self._refresh_nav(grid_x - 1, grid_x + 2, grid_y - 1, grid_y + 1) # Cells that can see this one
+        kind = TRIGGER_TILES.get(tile)
+        if kind: self.triggers[grid_y * self.cols + grid_x] = Trigger(kind, grid_x, grid_y)
+        else: self.triggers.pop(grid_y * self.cols + grid_x, None)
+        self._chunks.pop((grid_x // TILE_CHUNK_COLS, grid_y // TILE_CHUNK_ROWS), None)
+        if self.track_changes:
+            self.changed_tiles.append(pygame.Rect(grid_x * TILE_SIZE, grid_y * TILE_SIZE, TILE_SIZE, TILE_SIZE))
+
+    def _refresh_nav(self, first_col: int, last_col: int, first_row: int, last_row: int):
+        """Recomputes the navigation bits of the cells in columns [first_col, last_col) and rows [first_row, last_row)."""
+        flags, nav, stride = self.flags, self.nav, self.stride
+        first_col, last_col = max(first_col, self.first_resident_col), min(last_col, self.last_resident_col)
+        for grid_y in range(max(first_row, 0), min(last_row, self.rows)):
+            idx = self.cell_index(first_col, grid_y)
+            for _ in range(first_col, last_col):
+                cell = 0
+                if not flags[idx] & TILE_SOLID and flags[idx + stride] & TILE_SOLID:
+                    cell = NAV_STANDABLE
+                    if flags[idx - 1] & TILE_SOLID: cell |= NAV_WALL_LEFT
+                    elif not flags[idx + stride - 1] & TILE_SOLID: cell |= NAV_LEDGE_LEFT
+                    if flags[idx + 1] & TILE_SOLID: cell |= NAV_WALL_RIGHT
+                    elif not flags[idx + stride + 1] & TILE_SOLID: cell |= NAV_LEDGE_RIGHT
+                nav[idx] = cell
+                idx += 1
+
+    def ledge_ahead(self, rect, vel_x: float) -> int:
+        """Whether a grounded rect's next step in the direction of vel_x is off an edge. Nonzero means yes."""
+        grid_y = rect.bottom // TILE_SIZE - 1 # Row the rect stands in
+        if vel_x < 0:
+            return self.nav[self.cell_index((rect.left - 1) // TILE_SIZE + 1, grid_y)] & NAV_LEDGE_LEFT
+        return self.nav[self.cell_index(rect.right // TILE_SIZE - 1, grid_y)] & NAV_LEDGE_RIGHT
+
+    def collect_coins(self, rect) -> int:
+        """Clears the placed coins rect touches from the collectible layer and returns how many there were.
+
+        A coin is touched when rect overlaps the coin's TILE_SIZE // 2 square at the centre of its cell,
+        the same area a coin sprite would occupy.
+        """
+        flags = self.flags
+        collected = 0
+        coin_size = TILE_SIZE // 2
+        coin_offset = TILE_SIZE // 2 - coin_size // 2
+        first_col = rect.left // TILE_SIZE
+        for grid_y in range(rect.top // TILE_SIZE, (rect.bottom - 1) // TILE_SIZE + 1):
+            idx = self.cell_index(first_col, grid_y)
+            for grid_x in range(first_col, (rect.right - 1) // TILE_SIZE + 1):
+                if flags[idx] & TILE_COLLECTIBLE:
+                    coin_x = grid_x * TILE_SIZE + coin_offset
+                    coin_y = grid_y * TILE_SIZE + coin_offset
+                    if (rect.left < coin_x + coin_size and rect.right > coin_x and
+                            rect.top < coin_y + coin_size and rect.bottom > coin_y):
+                        self.set_tile(grid_x, grid_y, '.')
+                        collected += 1
+                idx += 1
+        return collected
+
+    def add_trigger(self, trigger: Trigger):
+        """Registers a trigger that no tile code implies, such as a warp with its destination."""
+        self.triggers[trigger.grid_y * self.cols + trigger.grid_x] = trigger
+
+    def triggers_touching(self, rect) -> list:
+        """Triggers in the cells rect overlaps, one dict lookup per cell."""
+        triggers = self.triggers
+        if not triggers:
+            return []
+        found = []
+        # Clamped to the level's columns, past its edges a key would alias into the next or previous row
+        first_col = max(rect.left // TILE_SIZE, 0)
+        last_col = min((rect.right - 1) // TILE_SIZE, self.cols - 1)
+        for grid_y in range(rect.top // TILE_SIZE, (rect.bottom - 1) // TILE_SIZE + 1):
+            key = grid_y * self.cols + first_col
+            for _ in range(first_col, last_col + 1):
+                trigger = triggers.get(key)
+                if trigger is not None:
+                    found.append(trigger)
+                key += 1
+        return found
+
+    def tile_flags(self, grid_x: int, grid_y: int) -> int:
+        """TILE_* flag bits of a cell."""
+        return self.flags[(grid_y + TILE_PAD) * self.stride + grid_x + self.col_offset]
+
+    def is_solid(self, grid_x: int, grid_y: int) -> int:
+        """Checks if a tile is solid for collision. Nonzero means solid."""
+        return self.flags[(grid_y + TILE_PAD) * self.stride + grid_x + self.col_offset] & TILE_SOLID
+
+    def is_breakable_brick(self, grid_x: int, grid_y: int) -> int:
+        """Checks if a tile is a breakable brick. Nonzero means breakable."""
+        return self.flags[(grid_y + TILE_PAD) * self.stride + grid_x + self.col_offset] & TILE_BREAKABLE
+
+    def sweep_x(self, rect, dx: float):
+        """Moves rect horizontally by dx, stopping flush against the first solid column it reaches.
+
+        Every column between the start and end position is tested, so any speed is safe.
+        Returns the grid x of the blocking column, or None if the move was clear.
+        """
+        x0 = rect.x
+        rect.x += dx # Let pygame round the target exactly as a plain move would
+        x1 = rect.x
+        if x1 == x0:
+            return None
+        flags, stride = self.flags, self.stride
+        first_row = rect.top // TILE_SIZE
+        row_count = (rect.bottom - 1) // TILE_SIZE - first_row + 1
+        row_base = (first_row + TILE_PAD) * stride + self.col_offset
+        if x1 > x0:
+            width = rect.width
+            columns = range((x0 + width - 1) // TILE_SIZE + 1, (x1 + width - 1) // TILE_SIZE + 1)
+        else:
+            columns = range(x0 // TILE_SIZE - 1, x1 // TILE_SIZE - 1, -1)
+        for grid_x in columns:
+            idx = row_base + grid_x
+            for _ in range(row_count):
+                if flags[idx] & TILE_SOLID:
+                    if x1 > x0: rect.right = grid_x * TILE_SIZE
+                    else: rect.left = (grid_x + 1) * TILE_SIZE
+                    return grid_x
+                idx += stride
+        return None
+
+    def sweep_y(self, rect, dy: float):
+        """Moves rect vertically by dy, stopping flush against the first solid row it reaches.
+
+        Returns (grid_x, grid_y) of the leftmost blocking tile in that row, or None if the move was clear.
+        """
+        y0 = rect.y
+        rect.y += dy
+        y1 = rect.y
+        if y1 == y0:
+            return None
+        flags, stride = self.flags, self.stride
+        first_col = rect.left // TILE_SIZE
+        last_col = (rect.right - 1) // TILE_SIZE
+        if y1 > y0:
+            height = rect.height
+            rows = range((y0 + height - 1) // TILE_SIZE + 1, (y1 + height - 1) // TILE_SIZE + 1)
+        else:
+            rows = range(y0 // TILE_SIZE - 1, y1 // TILE_SIZE - 1, -1)
+        for grid_y in rows:
+            idx = (grid_y + TILE_PAD) * stride + self.col_offset + first_col
+            for grid_x in range(first_col, last_col + 1):
+                if flags[idx] & TILE_SOLID:
+                    if y1 > y0: rect.bottom = grid_y * TILE_SIZE
+                    else: rect.top = (grid_y + 1) * TILE_SIZE
+                    return grid_x, grid_y
+                idx += 1
+        return None
+
+    def resting_on(self, rect):
+        """(grid_x, grid_y) of the leftmost solid tile directly under a rect whose bottom is on a tile edge, else None."""
+        if rect.bottom % TILE_SIZE:
+            return None
+        grid_y = rect.bottom // TILE_SIZE
+        idx = self.cell_index(rect.left // TILE_SIZE, grid_y)
+        for grid_x in range(rect.left // TILE_SIZE, (rect.right - 1) // TILE_SIZE + 1):
+            if self.flags[idx] & TILE_SOLID:
+                return grid_x, grid_y
+            idx += 1
+        return None
+
+    def hit_block(self, grid_x: int, grid_y: int, player_power_up: str, game):
+        """Handles player hitting a block from below by dispatching to the tile's on_hit handler."""
+        if not self.tile_flags(grid_x, grid_y) & TILE_BUMPABLE:
+            return False
+        return TILE_TYPES[self.get_tile(grid_x, grid_y)].on_hit(self, grid_x, grid_y, player_power_up, game)
+
+
+    def _draw_tile(self, surface, cell, rect):
+        """Draws a single tile into rect with its registered draw routine."""
+        tile_type = TILE_TYPES.get(cell)
+        if tile_type is not None and tile_type.draw is not None:
+            tile_type.draw(surface, rect)
+
+    def _bake_chunk(self, chunk_key: tuple) -> pygame.Surface:
+        """Pre-renders the tiles of one chunk onto its own surface."""
+        first_col = chunk_key[0] * TILE_CHUNK_COLS
+        last_col = min(self.cols, first_col + TILE_CHUNK_COLS)
+        first_row = chunk_key[1] * TILE_CHUNK_ROWS
+        last_row = min(self.rows, first_row + TILE_CHUNK_ROWS)
+        chunk = pygame.Surface(((last_col - first_col) * TILE_SIZE, (last_row - first_row) * TILE_SIZE))
+        if pygame.display.get_surface(): # Match the display pixel format for fast blits
+            chunk = chunk.convert()
+        chunk.fill(SKY_BLUE)
+
+        for y in range(first_row, last_row):
+            row = self.row(y, first_col, last_col)
+            for x in range(first_col, last_col):
+                rect = pygame.Rect((x - first_col) * TILE_SIZE, (y - first_row) * TILE_SIZE, TILE_SIZE, TILE_SIZE)
+                self._draw_tile(chunk, row[x - first_col], rect)
+        self._chunks[chunk_key] = chunk
+        return chunk
+
+    def bake_chunks(self):
+        """Pre-renders every resident chunk of the level up front. The game itself bakes chunks lazily in draw()."""
+        if self._raster: return # The numpy backend renders straight from the tile array
+        for chunk_y in range(self.chunk_rows):
+            for chunk_x in range(self.first_resident_col // TILE_CHUNK_COLS,
+                                 (self.last_resident_col + TILE_CHUNK_COLS - 1) // TILE_CHUNK_COLS):
+                if (chunk_x, chunk_y) not in self._chunks:
+                    self._bake_chunk((chunk_x, chunk_y))
+
+    def visible_range(self, surface, cam_x, cam_y):
+        """Tile columns and rows overlapping the viewport, as (first_col, last_col, first_row, last_row) exclusive."""
+        first_col = max(0, cam_x // TILE_SIZE)
+        last_col = min(self.cols, (cam_x + surface.get_width() - 1) // TILE_SIZE + 1)
+        first_row = max(0, cam_y // TILE_SIZE)
+        last_row = min(self.rows, (cam_y + surface.get_height() - 1) // TILE_SIZE + 1)
+        return first_col, last_col, first_row, last_row
+
+    def draw_immediate(self, surface, cam_x, cam_y=0):
+        """Draws the visible tiles one pygame.draw call at a time. Reference path for benchmarks."""
+        first_col, last_col, first_row, last_row = self.visible_range(surface, cam_x, cam_y)
+        for y in range(first_row, last_row):
+            row = self.row(y, first_col, last_col)
+            for x in range(first_col, last_col):
+                rect = pygame.Rect(x * TILE_SIZE - cam_x, y * TILE_SIZE - cam_y, TILE_SIZE, TILE_SIZE)
+                self._draw_tile(surface, row[x - first_col], rect)
+
+    def draw(self, surface, cam_x, cam_y=0):
+        """Draws the visible part of the level from the baked chunks."""
+        if self._raster:
+            self._raster.draw(surface, cam_x, cam_y)
+            return
+
+        first_chunk_x = max(0, cam_x // self.chunk_width)
+        last_chunk_x = min(self.chunk_cols - 1, (cam_x + surface.get_width() - 1) // self.chunk_width)
+        first_chunk_y = max(0, cam_y // self.chunk_height)
+        last_chunk_y = min(self.chunk_rows - 1, (cam_y + surface.get_height() - 1) // self.chunk_height)
+        if (first_chunk_x, last_chunk_x) != self._drawn_chunk_cols:
+            # Surfaces scrolled well out of view are dropped, so memory doesn't grow with the level's length
+            self._drawn_chunk_cols = (first_chunk_x, last_chunk_x)
+            self._chunks = {key: chunk for key, chunk in self._chunks.items()
+                            if first_chunk_x - TILE_CHUNK_KEEP <= key[0] <= last_chunk_x + TILE_CHUNK_KEEP}
+
+        for chunk_y in range(first_chunk_y, last_chunk_y + 1):
+            for chunk_x in range(first_chunk_x, last_chunk_x + 1):
+                chunk = self._chunks.get((chunk_x, chunk_y))
+                if chunk is None: # Not baked yet or invalidated by set_tile, bake just this chunk
+                    chunk = self._bake_chunk((chunk_x, chunk_y))
+                surface.blit(chunk, (chunk_x * self.chunk_width - cam_x, chunk_y * self.chunk_height - cam_y))
+
+
+class NumpyTileRasteriser:
+    """Level backend that views the tile plane as a uint8 array and rasterises
+    the viewport in one vectorised gather from pre-rendered tile pixels."""
+    def __init__(self, level):
+        self.level = level
+        # Tile index 0 is empty, then one index per registered tile type; unknown codes draw as empty
+        self.tile_codes = " " + "".join(TILE_TYPES)
+        self.lut = numpy.zeros(256, dtype=numpy.uint8) # Character code -> tile index
+        for tile_idx, code in enumerate(self.tile_codes):
+            self.lut[ord(code)] = tile_idx
+        # Zero-copy [y, x] view of the padded tile plane, so Level.set_tile updates it too
+        self.grid = numpy.frombuffer(level.tiles, dtype=numpy.uint8).reshape(-1, level.stride)
+        self._tile_pixels = None # (tile index, x, y) mapped pixels, built for the target's format
+        self._pixel_format = None
+        self._buffer = None
+
+    def _prepare(self, surface):
+        """Pre-renders every tile kind in the pixel format of the target surface."""
+        pixel_format = (surface.get_bitsize(), surface.get_masks())
+        if pixel_format == self._pixel_format:
+            return
+        tile_surface = pygame.Surface((TILE_SIZE, TILE_SIZE), 0, surface)
+        pixels = []
+        for code in self.tile_codes:
+            tile_surface.fill(SKY_BLUE)
+            self.level._draw_tile(tile_surface, code, tile_surface.get_rect())
+            pixels.append(pygame.surfarray.array2d(tile_surface))
+        self._tile_pixels = numpy.stack(pixels)
+        self._pixel_format = pixel_format
+        self._buffer = None
+
+    def draw(self, surface, cam_x, cam_y=0):
+        self._prepare(surface)
+        first_col, last_col, first_row, last_row = self.level.visible_range(surface, cam_x, cam_y)
+        if last_col <= first_col or last_row <= first_row:
+            return
 
+        # Tile indices of the visible cells, transposed to [x, y] to match pygame.surfarray
+        col_offset = self.level.col_offset
+        visible = self.lut[self.grid[first_row + TILE_PAD:last_row + TILE_PAD,
+                                     first_col + col_offset:last_col + col_offset]].T
+        cols, rows = visible.shape
+        buffer_size = (cols * TILE_SIZE, rows * TILE_SIZE)
+        if self._buffer is None or self._buffer.get_size() != buffer_size:
+            self._buffer = pygame.Surface(buffer_size, 0, surface)
+        # Write the gathered (cols, rows, T, T) tile pixels straight into the buffer,
+        # viewed as (cols, T, rows, T) so no intermediate image is built
+        buffer_pixels = pygame.surfarray.pixels2d(self._buffer)
+        buffer_pixels.reshape(cols, TILE_SIZE, rows, TILE_SIZE)[...] = self._tile_pixels[visible].transpose(0, 2, 1, 3)
+        del buffer_pixels # Unlock the buffer before blitting it
+        surface.blit(self._buffer, (first_col * TILE_SIZE - cam_x, first_row * TILE_SIZE - cam_y))
+
+
+# --- Compiled Level Cache ---
+# A compiled level file is a header followed by the padded tile, flag and navigation planes
+# and the spawn and trigger tables. Each plane starts on an mmap allocation boundary so it can be mapped
+# on its own; loading maps them copy-on-write instead of reading or parsing anything.
+LEVEL_FILE_MAGIC = b"SMWL"
+LEVEL_FILE_VERSION = 3
+# magic, version, TILE_PAD, cols, rows, spawn count, trigger count, tile/flag/nav/spawn/trigger table offsets
+LEVEL_FILE_HEADER = struct.Struct("<4sHHIIII5Q")
+LEVEL_FILE_SPAWN = struct.Struct("<BII") # code, grid x, grid y
+LEVEL_FILE_TRIGGER = struct.Struct("<BII") # tile code, grid x, grid y
+
+def level_cache_key(tilemap_str_list) -> str:
+    """Content hash of a tilemap plus everything compiling it depends on."""
+    digest = hashlib.sha1()
+    digest.update(struct.pack("<HHHH", LEVEL_FILE_VERSION, STREAM_FILE_VERSION, TILE_PAD, STREAM_CHUNK_COLS))
+    digest.update(bytes(TILE_FLAGS))
+    digest.update(repr(sorted(SPAWN_TYPES.items())).encode("latin-1"))
+    digest.update(repr(sorted(TRIGGER_TILES.items())).encode("latin-1"))
+    digest.update("\n".join(tilemap_str_list).encode("latin-1"))
+    return digest.hexdigest()
+
+def compile_level(tilemap_str_list, path: str):
+    """Writes the compiled form of a tilemap to path, atomically."""
+    level = Level(tilemap_str_list)
+    align = mmap.ALLOCATIONGRANULARITY
+    plane_size = len(level.tiles)
+    plane_span = (plane_size + align - 1) // align * align
+    tiles_offset = align # The header gets the first block to itself
+    flags_offset = tiles_offset + plane_span
+    nav_offset = flags_offset + plane_span
+    spawn_offset = nav_offset + plane_span
+    spawns = [(ord(code), x, y) for code, kind in SPAWN_TYPES.items() for x, y in level.spawns[kind]]
+    trigger_offset = spawn_offset + len(spawns) * LEVEL_FILE_SPAWN.size
+    # Tile triggers only, those are all a freshly built level has
+    triggers = [(level.tiles[level.cell_index(t.grid_x, t.grid_y)], t.grid_x, t.grid_y) for t in level.triggers.values()]
+
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(LEVEL_FILE_HEADER.pack(LEVEL_FILE_MAGIC, LEVEL_FILE_VERSION, TILE_PAD, level.cols, level.rows,
+                                       len(spawns), len(triggers), tiles_offset, flags_offset, nav_offset,
+                                       spawn_offset, trigger_offset))
+        for offset, plane in ((tiles_offset, level.tiles), (flags_offset, level.flags), (nav_offset, level.nav)):
+            f.seek(offset)
+            f.write(plane)
+        f.seek(spawn_offset)
+        for spawn in spawns:
+            f.write(LEVEL_FILE_SPAWN.pack(*spawn))
+        for trigger in triggers:
+            f.write(LEVEL_FILE_TRIGGER.pack(*trigger))
+    os.replace(temp_path, path)
+
+def load_compiled_level(path: str, tile_renderer="chunks", physics="float") -> Level:
+    """Maps a compiled level file. Tile changes go to private copy-on-write pages, never to the file."""
+    with open(path, "rb") as f:
+        header = LEVEL_FILE_HEADER.unpack(f.read(LEVEL_FILE_HEADER.size))
+        (magic, version, pad, cols, rows, spawn_count, trigger_count,
+         tiles_offset, flags_offset, nav_offset, spawn_offset, trigger_offset) = header
+        if magic != LEVEL_FILE_MAGIC or version != LEVEL_FILE_VERSION or pad != TILE_PAD:
+            raise ValueError(f"{path} is not a compatible compiled level")
+        plane_size = (cols + 2 * TILE_PAD) * (rows + 2 * TILE_PAD)
+        tiles, flags, nav = (mmap.mmap(f.fileno(), plane_size, access=mmap.ACCESS_COPY, offset=offset)
+                             for offset in (tiles_offset, flags_offset, nav_offset))
+        f.seek(spawn_offset)
+        spawns = {kind: [] for kind in SPAWN_TYPES.values()}
+        for code, x, y in LEVEL_FILE_SPAWN.iter_unpack(f.read(spawn_count * LEVEL_FILE_SPAWN.size)):
+            spawns[SPAWN_TYPES[chr(code)]].append((x, y))
+        f.seek(trigger_offset) # Read from the table rather than scanning the tile plane for trigger tiles
+        triggers = {y * cols + x: Trigger(TRIGGER_TILES[chr(code)], x, y) for code, x, y in
+                    LEVEL_FILE_TRIGGER.iter_unpack(f.read(trigger_count * LEVEL_FILE_TRIGGER.size))}
+    return Level.from_planes(cols, rows, tiles, flags, nav, spawns, tile_renderer, physics, triggers)
+
+def load_level(tilemap_str_list, tile_renderer="chunks", physics="float", cache_dir=LEVEL_CACHE_DIR,
+               streamed=False) -> Level:
+    """Loads a tilemap through the compiled level cache, compiling it on first use.
+
+    streamed loads a StreamedLevel, which pages the level in by column chunks as stream() asks for them.
+    """
+    path = os.path.join(cache_dir, level_cache_key(tilemap_str_list) + (".stream" if streamed else ".lvl"))
+    try:
+        if not os.path.exists(path):
+            os.makedirs(cache_dir, exist_ok=True)
+            (compile_streamed_level if streamed else compile_level)(tilemap_str_list, path)
+        if streamed:
+            return StreamedLevel(path, tile_renderer, physics)
+        return load_compiled_level(path, tile_renderer, physics)
+    except (OSError, ValueError, struct.error) as e:
+        print(f"Warning: Level cache unavailable ({e}). Building the level in memory.")
+        return Level(tilemap_str_list, tile_renderer, physics)
+
+
+# --- Streamed Levels ---
+# A streamed level file is a header, the player spawns, a directory with one entry per
+# STREAM_CHUNK_COLS wide column chunk and then the chunk blocks. A block holds the chunk's
+# padded tile, flag and navigation columns, each row-major and STREAM_CHUNK_COLS wide,
+# followed by the spawn records inside the chunk, so paging a chunk in is one read.
+STREAM_FILE_MAGIC = b"SMWS"
+STREAM_FILE_VERSION = 1
+# magic, version, TILE_PAD, cols, rows, chunk width, chunk count, player spawn count
+STREAM_FILE_HEADER = struct.Struct("<4sHHIIIII")
+STREAM_FILE_CHUNK = struct.Struct("<QI") # block offset, spawn count
+
+def compile_streamed_level(tilemap_str_list, path: str):
+    """Writes the chunked form of a tilemap to path, atomically."""
+    level = Level(tilemap_str_list)
+    codes = {kind: ord(code) for code, kind in SPAWN_TYPES.items()}
+    chunk_count = (level.cols + STREAM_CHUNK_COLS - 1) // STREAM_CHUNK_COLS
+    chunk_spawns = [[] for _ in range(chunk_count)]
+    for kind, cells in level.spawns.items():
+        if kind != "player":
+            for x, y in cells:
+                chunk_spawns[x // STREAM_CHUNK_COLS].append((codes[kind], x, y))
+    players = level.spawns["player"]
+    padded_rows = level.rows + 2 * TILE_PAD
+    block_size = 3 * padded_rows * STREAM_CHUNK_COLS
+    offset = STREAM_FILE_HEADER.size + len(players) * LEVEL_FILE_SPAWN.size + chunk_count * STREAM_FILE_CHUNK.size
+
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(STREAM_FILE_HEADER.pack(STREAM_FILE_MAGIC, STREAM_FILE_VERSION, TILE_PAD, level.cols, level.rows,
+                                        STREAM_CHUNK_COLS, chunk_count, len(players)))
+        for x, y in players:
+            f.write(LEVEL_FILE_SPAWN.pack(codes["player"], x, y))
+        for spawns in chunk_spawns:
+            f.write(STREAM_FILE_CHUNK.pack(offset, len(spawns)))
+            offset += block_size + len(spawns) * LEVEL_FILE_SPAWN.size
+        for chunk, spawns in enumerate(chunk_spawns):
+            first_col = chunk * STREAM_CHUNK_COLS
+            width = min(STREAM_CHUNK_COLS, level.cols - first_col) # The last chunk is filled out with empty columns
+            for plane, fill in ((level.tiles, b" "), (level.flags, b"\0"), (level.nav, b"\0")):
+                for row in range(padded_rows):
+                    start = row * level.stride + TILE_PAD + first_col
+                    f.write(plane[start:start + width].ljust(STREAM_CHUNK_COLS, fill))
+            for spawn in spawns:
+                f.write(LEVEL_FILE_SPAWN.pack(*spawn))
+    os.replace(temp_path, path)
+
+class StreamedLevel(Level):
+    """A level paged in from a streamed level file by STREAM_CHUNK_COLS wide column chunks.
+
+    The planes only hold a window of STREAM_WINDOW_CHUNKS chunks, so memory and load time
+    don't grow with the level's length. Grid coordinates stay level-wide, col_offset maps
+    them into the window. stream() moves the window: chunks leaving it go to a small LRU
+    cache, or are kept until the level is dropped if any of their tiles changed.
+    """
+    streamed = True
+
+    def __init__(self, path: str, tile_renderer="chunks", physics="float"):
+        self._file = open(path, "rb")
+        try:
+            magic, version, pad, cols, rows, chunk_cols, chunk_count, player_count = \
+                STREAM_FILE_HEADER.unpack(self._file.read(STREAM_FILE_HEADER.size))
+            if (magic != STREAM_FILE_MAGIC or version != STREAM_FILE_VERSION or pad != TILE_PAD or
+                    chunk_cols != STREAM_CHUNK_COLS):
+                raise ValueError(f"{path} is not a compatible streamed level")
+            players = [(x, y) for _, x, y in
+                       LEVEL_FILE_SPAWN.iter_unpack(self._file.read(player_count * LEVEL_FILE_SPAWN.size))]
+        except (ValueError, struct.error):
+            self._file.close()
+            raise
+        self.chunk_count = chunk_count
+        self._directory_offset = STREAM_FILE_HEADER.size + player_count * LEVEL_FILE_SPAWN.size
+        self._window_chunks = min(STREAM_WINDOW_CHUNKS, chunk_count)
+        self._chunk_plane = (rows + 2 * TILE_PAD) * STREAM_CHUNK_COLS # Bytes per plane of one chunk
+        plane_size = (self._window_chunks * STREAM_CHUNK_COLS + 2 * TILE_PAD) * (rows + 2 * TILE_PAD)
+        spawns = {kind: [] for kind in SPAWN_TYPES.values()} # Other kinds come with their chunks from stream()
+        spawns["player"] = players
+        self._attach(cols, rows, bytearray(b" ") * plane_size, bytearray(plane_size), bytearray(plane_size),
+                     spawns, tile_renderer, physics, {}) # Triggers are indexed as chunks are paged in
+        self.last_resident_col = 0 # Nothing paged in yet
+        self._first_chunk = self._last_chunk = 0 # Resident chunks [first, last), in window slot order
+        self._resident_spawns = {} # Resident chunk -> its spawn records
+        self._dirty = set() # Resident chunks with changed tiles
+        self._changed = {} # Evicted chunk with changed tiles -> its block
+        self._cache = OrderedDict() # Evicted chunk -> its block, least recently used first
+        self.chunk_loads = 0 # Chunks read from the file
+        self.chunk_evictions = 0
+
+    def close(self):
+        self._file.close()
+
+    def _read_chunk(self, chunk: int) -> tuple:
+        """Reads the block of a chunk from the file: (tiles, flags, nav, spawn records)."""
+        self._file.seek(self._directory_offset + chunk * STREAM_FILE_CHUNK.size)
+        offset, spawn_count = STREAM_FILE_CHUNK.unpack(self._file.read(STREAM_FILE_CHUNK.size))
+        self._file.seek(offset)
+        size = self._chunk_plane
+        data = self._file.read(3 * size + spawn_count * LEVEL_FILE_SPAWN.size)
+        spawns = [(SPAWN_TYPES[chr(code)], x, y) for code, x, y in LEVEL_FILE_SPAWN.iter_unpack(data[3 * size:])]
+        self.chunk_loads += 1
+        return data[:size], data[size:2 * size], data[2 * size:3 * size], spawns
+
+    def _fetch_chunk(self, chunk: int) -> tuple:
+        """The block of a chunk that is about to become resident, from memory if it was evicted before."""
+        block = self._changed.pop(chunk, None)
+        if block is not None:
+            self._dirty.add(chunk)
+            return block
+        block = self._cache.pop(chunk, None)
+        return block if block is not None else self._read_chunk(chunk)
+
+    def _peek_chunk(self, chunk: int) -> tuple:
+        """The block of a chunk that stays out of the window, cached if it had to be read."""
+        block = self._changed.get(chunk) or self._cache.get(chunk)
+        if block is None:
+            block = self._cache[chunk] = self._read_chunk(chunk)
+            if len(self._cache) > STREAM_CACHE_CHUNKS:
+                self._cache.popitem(last=False)
+        return block
+
+    def _copy_out(self, slot: int) -> tuple:
+        """The tile, flag and nav planes of the chunk in window slot, copied out of the level planes."""
+        start = TILE_PAD + slot * STREAM_CHUNK_COLS
+        rows = range(0, (self.rows + 2 * TILE_PAD) * self.stride, self.stride)
+        return tuple(b"".join(plane[row + start:row + start + STREAM_CHUNK_COLS] for row in rows)
+                     for plane in (self.tiles, self.flags, self.nav))
+
+    def _copy_in(self, slot: int, block: tuple):
+        """Writes a chunk's planes into window slot, in place so views of the level planes stay valid."""
+        start = TILE_PAD + slot * STREAM_CHUNK_COLS
+        for plane, data in zip((self.tiles, self.flags, self.nav), block):
+            src = 0
+            for row in range(start, start + (self.rows + 2 * TILE_PAD) * self.stride, self.stride):
+                plane[row:row + STREAM_CHUNK_COLS] = data[src:src + STREAM_CHUNK_COLS]
+                src += STREAM_CHUNK_COLS
+
+    def _fill_pad(self, column: int, chunk: int, first: int):
+        """Copies TILE_PAD columns of chunk, from its column first on, into plane column column.
+
+        Chunks outside the level copy in as empty space.
+        """
+        if 0 <= chunk < self.chunk_count:
+            block = self._peek_chunk(chunk)
+        else:
+            block = (b" " * self._chunk_plane, bytes(self._chunk_plane), bytes(self._chunk_plane))
+        for plane, data in zip((self.tiles, self.flags, self.nav), block):
+            src = first
+            for row in range(column, column + (self.rows + 2 * TILE_PAD) * self.stride, self.stride):
+                plane[row:row + TILE_PAD] = data[src:src + TILE_PAD]
+                src += STREAM_CHUNK_COLS
+
+    def _fill_edges(self):
+        """Mirrors the neighbouring chunks into the pad columns either side of the window.
+
+        Cells on the window's edge then see their real neighbours, so their navigation bits,
+        recomputed here, match the whole level's.
+        """
+        self._fill_pad(0, self._first_chunk - 1, STREAM_CHUNK_COLS - TILE_PAD)
+        self._fill_pad(TILE_PAD + self._window_chunks * STREAM_CHUNK_COLS, self._last_chunk, 0)
+        self._refresh_nav(self.first_resident_col, self.first_resident_col + 1, 0, self.rows)
+        self._refresh_nav(self.last_resident_col - 1, self.last_resident_col, 0, self.rows)
+
+    def stream(self, first_col: int, last_col: int):
+        """Makes grid columns [first_col, last_col) resident, re-centring the window on them if they aren't.
+
+        Returns (loaded, evicted): [(chunk, spawn records)] for the chunks paged in, the records
+        being (entity kind, grid x, grid y), and the chunks paged out. The caller instantiates
+        and parks their entities; nothing outside the window may touch the planes.
+        """
+        if not self.chunk_count:
+            return [], []
+        first_col = max(0, min(first_col, self.cols - 1))
+        last_col = max(first_col + 1, min(last_col, self.cols))
+        first_chunk = first_col // STREAM_CHUNK_COLS
+        last_chunk = (last_col - 1) // STREAM_CHUNK_COLS + 1
+        if self._first_chunk <= first_chunk and last_chunk <= self._last_chunk:
+            return [], []
+        start = max(0, min((first_chunk + last_chunk - self._window_chunks) // 2, self.chunk_count - self._window_chunks))
+        window = range(start, start + self._window_chunks)
+
+        resident = {chunk: self._copy_out(slot) + (self._resident_spawns[chunk],)
+                    for slot, chunk in enumerate(range(self._first_chunk, self._last_chunk))}
+        evicted = [chunk for chunk in resident if chunk not in window]
+        for chunk in evicted:
+            if chunk in self._dirty:
+                self._dirty.discard(chunk)
+                self._changed[chunk] = resident[chunk]
+            else:
+                self._cache[chunk] = resident[chunk]
+                if len(self._cache) > STREAM_CACHE_CHUNKS:
+                    self._cache.popitem(last=False)
+            self.chunk_evictions += 1
+        loaded = []
+        self._resident_spawns = {}
+        for slot, chunk in enumerate(window):
+            block = resident.get(chunk)
+            if block is None:
+                block = self._fetch_chunk(chunk)
+                loaded.append((chunk, block[3]))
+            self._copy_in(slot, block)
+            self._resident_spawns[chunk] = block[3]
+
+        self._first_chunk, self._last_chunk = window.start, window.stop
+        self.first_resident_col = window.start * STREAM_CHUNK_COLS
+        self.last_resident_col = min(self.cols, window.stop * STREAM_CHUNK_COLS)
+        self.col_offset = TILE_PAD - self.first_resident_col
+        # A paged-in chunk's seam columns took their navigation bits from neighbours that may have
+        # changed since it was written out, so they're recomputed against the current ones
+        for chunk, _ in loaded:
+            first = chunk * STREAM_CHUNK_COLS
+            self._refresh_nav(first, first + 1, 0, self.rows)
+            self._refresh_nav(first + STREAM_CHUNK_COLS - 1, first + STREAM_CHUNK_COLS, 0, self.rows)
+        self._fill_edges()
+        # Tile triggers follow the window; ones registered with a target, like warps, stay
+        self.triggers = {key: trigger for key, trigger in self.triggers.items() if trigger.target is not None or
+                         self.first_resident_col <= trigger.grid_x < self.last_resident_col}
+        for chunk, _ in loaded:
+            self._index_triggers(chunk * STREAM_CHUNK_COLS, min(self.cols, (chunk + 1) * STREAM_CHUNK_COLS))
+        # Baked tile surfaces are dropped with their columns so they don't pile up along the level
+        self._chunks = {key: surface for key, surface in self._chunks.items()
+                        if self.first_resident_col <= key[0] * TILE_CHUNK_COLS < self.last_resident_col}
+        return loaded, evicted
 
-    def draw(self, surface, cam_x):
-        """Draws the visible part of the level."""
-        start_col = cam_x // TILE_SIZE
-        end_col = start_col + (WIDTH // TILE_SIZE) + 2 
-
-        for y, row_list in enumerate(self.tilemap):
-            for x in range(max(0, start_col), min(self.cols, end_col)):
-                cell = row_list[x]
-                rect = pygame.Rect(x * TILE_SIZE - cam_x, y * TILE_SIZE, TILE_SIZE, TILE_SIZE)
-                if cell == "S":
-                    pygame.draw.rect(surface, BROWN, rect)
-                elif cell == "?":
-                    pygame.draw.rect(surface, GOLD, rect)
-                elif cell == "Q": # Hit question block
-                    pygame.draw.rect(surface, LIGHT_BROWN, rect)
-                elif cell == "B":
-                    pygame.draw.rect(surface, BRICK_COLOR, rect)
-                elif cell == "C": 
-                    pygame.draw.circle(surface, YELLOW, rect.center, TILE_SIZE // 3)
-                elif cell == "M": 
-                     pygame.draw.rect(surface, BRIGHT_RED, rect.inflate(-TILE_SIZE//3, -TILE_SIZE//3))
-                elif cell == "G":
-                    pygame.draw.rect(surface, GREEN, rect) 
-                    pygame.draw.circle(surface, WHITE, rect.center, TILE_SIZE // 3)
-
-
-class Entity(pygame.sprite.Sprite):
+    def get_tile(self, grid_x: int, grid_y: int) -> str:
+        """Gets a resident tile. Columns outside the window read as empty space."""
+        if self.first_resident_col <= grid_x < self.last_resident_col:
+            return super().get_tile(grid_x, grid_y)
+        return " "
+
+    def set_tile(self, grid_x: int, grid_y: int, tile: str):
+        """Changes a resident tile. Its chunk keeps the change through evictions."""
+        if self.first_resident_col <= grid_x < self.last_resident_col:
+            super().set_tile(grid_x, grid_y, tile)
+            self._dirty.add(grid_x // STREAM_CHUNK_COLS)
+
+    def rollback(self):
+        """Restores the level as loaded. Changed chunks that were evicted are just forgotten, the file has them as loaded."""
+        first_col, last_col = self.first_resident_col, self.last_resident_col
+        self.journal = [change for change in self.journal if first_col <= change[0] < last_col]
+        super().rollback()
+        self._changed.clear()
+        self._dirty.clear()
+        if self.chunk_count:
+            self._fill_edges() # The pads may mirror changes that were just forgotten
+
+    def resident_spawns(self) -> list:
+        """[(chunk, spawn records)] of the resident chunks, as stream() returned them when they were loaded."""
+        return list(self._resident_spawns.items())
+
+    def stream_stats(self) -> dict:
+        """Chunk residency and traffic, plus the bytes of level data held in memory."""
+        held_chunks = len(self._cache) + len(self._changed)
+        surface_bytes = sum(surface.get_width() * surface.get_height() * surface.get_bytesize()
+                            for surface in self._chunks.values())
+        return {"resident_chunks": self._last_chunk - self._first_chunk, "cached_chunks": len(self._cache),
+                "changed_chunks": len(self._changed), "loads": self.chunk_loads, "evictions": self.chunk_evictions,
+                "resident_bytes": 3 * len(self.tiles) + 3 * self._chunk_plane * held_chunks + surface_bytes}
+
+
+# --- Level Prefetching ---
+class LevelPrefetcher:
+    """Builds levels on a worker thread before they are entered.
+
+    request() queues a level, the most recent request is built first. take() hands a
+    built level over: at once when it is ready, after waiting for it when it is still
+    queued or being built, and None when it was never requested. Each built level is
+    handed out once, so it is always fresh.
+    """
+    def __init__(self, build, limit=PREFETCH_LEVELS):
+        self._build = build # Level key -> Level, runs on the worker thread
+        self.limit = limit
+        self._lock = threading.Condition()
+        self._queue = [] # Level keys waiting to be built, most recent request last
+        self._building = None
+        self._waiting = None # Key take() is blocked on, never dropped from _ready
+        self._ready = OrderedDict() # Level key -> built Level (None if building failed), oldest first
+        self.hits = 0 # take() found the level ready
+        self.waits = 0 # take() found it queued or half built and waited
+        self.misses = 0 # take() found nothing, the level loads synchronously
+        threading.Thread(target=self._run, name="level-prefetch", daemon=True).start()
+
+    def request(self, key):
+        """Queues a level to be built, unless it is already built or on its way."""
+        with self._lock:
+            if key in self._ready or key == self._building or key in self._queue:
+                return
+            self._queue.append(key)
+            if len(self._queue) > self.limit:
+                self._queue.pop(0) # Stale requests, e.g. levels the overworld cursor passed over
+            self._lock.notify_all()
+
+    def take(self, key):
+        """The built level for key, or None when it has to be loaded synchronously."""
+        with self._lock:
+            if key in self._ready:
+                level = self._ready.pop(key)
+                if level is None: self.misses += 1 # Building it failed
+                else: self.hits += 1
+                return level
+            if key != self._building and key not in self._queue:
+                self.misses += 1
+                return None
+            self.waits += 1
+            if key in self._queue: # Build it next
+                self._queue.remove(key)
+                self._queue.append(key)
+            self._waiting = key
+            while key not in self._ready:
+                self._lock.wait()
+            self._waiting = None
+            return self._ready.pop(key)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._queue:
+                    self._lock.wait()
+                key = self._building = self._queue.pop()
+            try:
+                level = self._build(key)
+            except Exception as e: # Never let the worker die, the game loads the level itself then
+                print(f"Warning: Prefetching level {key} failed ({e}).")
+                level = None
+            with self._lock:
+                self._building = None
+                self._ready[key] = level
+                while len(self._ready) > self.limit: # Drop the oldest, but never the one take() waits for
+                    stale = next((old for old in self._ready if old not in (key, self._waiting)), None)
+                    if stale is None: break
+                    dropped = self._ready.pop(stale)
+                    if dropped is not None and dropped.streamed:
+                        dropped.close()
+                self._lock.notify_all()
+
+    def stats(self) -> dict:
+        taken = self.hits + self.waits + self.misses
+        return {"hits": self.hits, "waits": self.waits, "misses": self.misses,
+                "hit_rate": round(self.hits / taken, 2) if taken else None}
+
+
+class Entity(IndexedSprite):
     """Base class for Player and Enemy."""
     def __init__(self, spawn_x: int, spawn_y: int, level: Level, color, width=TILE_SIZE, height=TILE_SIZE):
         super().__init__()
-        self.image = pygame.Surface([width, height]) # Base image
-        self.image.fill(color) # Fill with color
+        self.image = sprite_images.get("block", (width, height), color) # Shared, never drawn on
         self.rect = self.image.get_rect()
         self.rect.topleft = (spawn_x * TILE_SIZE, spawn_y * TILE_SIZE)
         
         self.level = level
-        self.vel_x = 0.0
-        self.vel_y = 0.0
+        self.vel_x = 0 # In level.physics units
+        self.vel_y = 0
         self._on_ground = False
         self.color = color # Store color for potential changes (e.g. powerups)
         self.initial_spawn_x_tile = spawn_x # Store tile coordinates
         self.initial_spawn_y_tile = spawn_y
 
     def _move_axis(self, dx: float, dy: float, game=None): # Pass game for player block hitting
-        """Move entity and resolve collisions along one axis at a time."""
-        self.rect.x += dx
-        self._resolve_collisions(axis="x", game=game)
-
-        self.rect.y += dy
-        self._resolve_collisions(axis="y", game=game)
-
-
-    def _resolve_collisions(self, axis: str, game=None): # Pass game for player block hitting
-        """Resolves collisions with solid tiles after movement."""
-        margin = 1 
-        left_tile = self.rect.left // TILE_SIZE
-        right_tile = (self.rect.right - margin) // TILE_SIZE
-        top_tile = self.rect.top // TILE_SIZE
-        bottom_tile = (self.rect.bottom - margin) // TILE_SIZE
-
-        for gy in range(top_tile, bottom_tile + 1):
-            for gx in range(left_tile, right_tile + 1):
-                if self.level.is_solid(gx, gy):
-                    tile_rect = pygame.Rect(gx * TILE_SIZE, gy * TILE_SIZE, TILE_SIZE, TILE_SIZE)
-                    if self.rect.colliderect(tile_rect):
-                        if axis == "x":
-                            if self.vel_x > 0: self.rect.right = tile_rect.left
-                            elif self.vel_x < 0: self.rect.left = tile_rect.right
-                            if isinstance(self, Enemy): self.vel_x *= -1
-                            else: self.vel_x = 0
-                        elif axis == "y":
-                            if self.vel_y > 0: 
-                                self.rect.bottom = tile_rect.top
-                                self._on_ground = True
-                            elif self.vel_y < 0: 
-                                self.rect.top = tile_rect.bottom
-                                if isinstance(self, Player) and game: # Player hitting block
-                                    # Pass game.items (the sprite group) to hit_block
-                                    self.level.hit_block(gx, gy, self.power_up, game.items, game)
-                            self.vel_y = 0
+        """Sweeps the entity along x then y against the tile grid, calling the response hooks on contact."""
+        x_hit, y_hit = self._sweep(dx, dy)
+        if x_hit is not None:
+            self._on_wall()
+        if y_hit is not None:
+            if dy > 0: self._on_land()
+            else: self._on_ceiling(y_hit[0], y_hit[1], game)
+
+    # Collision responses, overridden by subclasses
+    def _on_wall(self):
+        self.vel_x = 0
+
+    def _on_land(self):
+        self._on_ground = True
+        self.vel_y = 0
+
+    def _on_ceiling(self, grid_x: int, grid_y: int, game=None):
+        self.vel_y = 0
     
     def respawn(self):
         self.rect.x = self.initial_spawn_x_tile * TILE_SIZE
         self.rect.y = self.initial_spawn_y_tile * TILE_SIZE
         self.vel_x = 0
         self.vel_y = 0
+        self.sub_x = self.sub_y = 0
         self._on_ground = False
         if isinstance(self, Enemy): 
-            self.vel_x = -ENEMY_SPEED # Reset enemy direction
+            self.vel_x = -self.level.physics.enemy_speed # Reset enemy direction
         if isinstance(self, Player): # Player specific respawn
             self.power_up = "small"
             self.rect.height = TILE_SIZE
-            self.image = pygame.Surface([TILE_SIZE, TILE_SIZE])
-            self.image.fill(self.color)
+            self.image = sprite_images.get("block", (TILE_SIZE, TILE_SIZE), self.color)
+        self.snapshot() # Teleported, don't interpolate from the old position
 
 
-    def draw(self, surface, cam_x):
+    def draw(self, surface, cam_x, cam_y=0, alpha=1.0):
         """Draws the entity."""
-        draw_rect = self.rect.copy()
-        draw_rect.x -= cam_x
-        surface.blit(self.image, draw_rect)
+        x, y = self.lerp_pos(alpha)
+        surface.blit(self.image, (x - cam_x, y - cam_y))
 
 
 class Player(Entity):
@@ -339,17 +1630,18 @@ class Player(Entity):
         if self.invincible_timer > 0:
             self.invincible_timer -= 1
 
+        physics = self.level.physics
         self.vel_x = 0
-        if keys[pygame.K_LEFT]: self.vel_x = -PLAYER_SPEED
-        if keys[pygame.K_RIGHT]: self.vel_x = PLAYER_SPEED
+        if keys[pygame.K_LEFT]: self.vel_x = -physics.player_speed
+        if keys[pygame.K_RIGHT]: self.vel_x = physics.player_speed
 
         if (keys[pygame.K_UP] or keys[pygame.K_SPACE]) and self._on_ground:
-            self.vel_y = PLAYER_JUMP_VELOCITY
+            self.vel_y = physics.jump_velocity
             self._on_ground = False 
             game.play_sound("jump")
 
-        self.vel_y += GRAVITY
-        if self.vel_y > TILE_SIZE: self.vel_y = TILE_SIZE # Terminal velocity
+        self.vel_y += physics.gravity
+        if self.vel_y > physics.terminal_velocity: self.vel_y = physics.terminal_velocity
 
         self._on_ground = False 
         self._move_axis(self.vel_x, self.vel_y, game) # Pass game for block hitting
@@ -357,24 +1649,33 @@ class Player(Entity):
         if self.rect.top > self.level.height + TILE_SIZE * 2 : 
             self.take_damage(game, fall_death=True)
 
-        # Check for goal
-        # Simpler goal check: if player center is within a goal tile
-        player_center_gx = self.rect.centerx // TILE_SIZE
-        player_center_gy = self.rect.centery // TILE_SIZE
-        if self.level.get_tile(player_center_gx, player_center_gy) == 'G':
-             # Check if any part of the player overlaps a goal tile
-            left_tile = self.rect.left // TILE_SIZE
-            right_tile = (self.rect.right -1) // TILE_SIZE
-            top_tile = self.rect.top // TILE_SIZE
-            bottom_tile = (self.rect.bottom -1) // TILE_SIZE
-            for gy_g in range(top_tile, bottom_tile + 1):
-                for gx_g in range(left_tile, right_tile + 1):
-                    if self.level.get_tile(gx_g, gy_g) == 'G':
-                        self.on_goal = True
-                        break
-                if self.on_goal: break
+        # Goal, checkpoints, warps and kill zones the player overlaps
+        for trigger in self.level.triggers_touching(self.rect):
+            if self._on_trigger(trigger, game):
+                break
+
+    def _on_trigger(self, trigger: Trigger, game) -> bool:
+        """Reacts to an overlapped trigger. True means the player moved and later triggers no longer apply."""
+        if trigger.kind == TRIGGER_GOAL:
+            self.on_goal = True
+        elif trigger.kind == TRIGGER_CHECKPOINT:
+            self.initial_spawn_x_tile = trigger.grid_x
+            self.initial_spawn_y_tile = trigger.grid_y
+        elif trigger.kind == TRIGGER_WARP:
+            self.rect.topleft = (trigger.target[0] * TILE_SIZE, trigger.target[1] * TILE_SIZE)
+            self.snapshot() # Teleported, don't interpolate
+            return True
+        elif trigger.kind == TRIGGER_KILL:
+            self.take_damage(game, fall_death=True)
+            return True
+        return False
 
 
+    def _on_ceiling(self, grid_x: int, grid_y: int, game=None):
+        self.vel_y = 0
+        if game: # Player hitting block
+            self.level.hit_block(grid_x, grid_y, self.power_up, game)
+
     def take_damage(self, game, fall_death=False): 
         if self.invincible_timer > 0 and not fall_death: return
 
@@ -382,8 +1683,7 @@ class Player(Entity):
             self.power_up = "small"
             self.rect.height = TILE_SIZE 
             self.rect.y += TILE_SIZE 
-            self.image = pygame.Surface([TILE_SIZE, TILE_SIZE]) # Resize surface
-            self.image.fill(self.color)
+            self.image = sprite_images.get("block", (TILE_SIZE, TILE_SIZE), self.color)
             self.invincible_timer = FPS * 2 
             game.play_sound("power_down")
         else:
@@ -394,6 +1694,7 @@ class Player(Entity):
                 game.play_sound("game_over_player")
             else:
                 self.respawn() 
+                game.restart_level()
                 game.play_sound("player_die")
 
 
@@ -403,75 +1704,239 @@ class Player(Entity):
                 self.power_up = "big"
                 self.rect.height = TILE_SIZE * 2
                 self.rect.y -= TILE_SIZE 
-                self.image = pygame.Surface([TILE_SIZE, TILE_SIZE * 2]) # Resize surface
-                self.image.fill(self.color)
+                self.image = sprite_images.get("block", (TILE_SIZE, TILE_SIZE * 2), self.color)
                 game.play_sound("power_up")
             self.score += 1000 
         elif item.type == "coin":
-            self.score += 200
-            game.play_sound("coin")
+            self.collect_coin(game)
         return True 
 
+    def collect_coin(self, game):
+        self.score += 200
+        game.play_sound("coin")
+
     # Respawn is handled by Entity, player specific parts are in Entity.respawn()
 
-    def draw(self, surface, cam_x):
+    def draw(self, surface, cam_x, cam_y=0, alpha=1.0):
         if self.invincible_timer > 0 and (self.invincible_timer // (FPS // 10)) % 2 == 0:
             return # Skip drawing for blink effect
 
-        draw_rect = self.rect.copy()
-        draw_rect.x -= cam_x
-        
         # Color doesn't change for big player in this version, size is the indicator
-        surface.blit(self.image, draw_rect)
+        x, y = self.lerp_pos(alpha)
+        surface.blit(self.image, (x - cam_x, y - cam_y))
 
 class Enemy(Entity):
     """Represents an enemy character."""
     def __init__(self, spawn_x: int, spawn_y: int, level: Level):
         super().__init__(spawn_x, spawn_y, level, GREEN)
-        self.vel_x = -ENEMY_SPEED 
+        self.vel_x = -level.physics.enemy_speed
+
+    def _on_wall(self):
+        self.vel_x *= -1 # Turn around
 
     def update(self):
-        self.vel_y += GRAVITY
-        if self.vel_y > TILE_SIZE: self.vel_y = TILE_SIZE
-        
-        self._on_ground = False 
+        physics = self.level.physics
+        self.vel_y += physics.gravity
+        if self.vel_y > physics.terminal_velocity: self.vel_y = physics.terminal_velocity
 
-        # Ledge and wall detection
-        if self._on_ground: 
-            next_step_gx = -1
-            wall_check_gx = -1
-            if self.vel_x < 0: 
-                next_step_gx = (self.rect.left - 1) // TILE_SIZE 
-                wall_check_gx = (self.rect.left -1) // TILE_SIZE
-            elif self.vel_x > 0: 
-                next_step_gx = self.rect.right // TILE_SIZE
-                wall_check_gx = self.rect.right // TILE_SIZE
-            
-            if next_step_gx != -1:
-                ground_level_gy = (self.rect.bottom) // TILE_SIZE # Check tile below next step
-                enemy_mid_gy = self.rect.centery // TILE_SIZE
-
-                # Check for solid tile for ledge detection slightly below enemy's current bottom
-                # to ensure it's actually a ledge and not a 1-tile high step down.
-                # For simplicity, we check the tile directly at ground_level_gy.
-                # A more robust check would be self.level.is_solid(next_step_gx, ground_level_gy +1)
-                # but that might make them fall off 1-tile high platforms.
-                
-                # If there's a wall in front (at enemy's height) OR no ground ahead
-                if self.level.is_solid(wall_check_gx, enemy_mid_gy) or \
-                   not self.level.is_solid(next_step_gx, ground_level_gy):
-                    # Collision resolution will handle wall turning.
-                    # For ledges, explicitly turn here.
-                    if not self.level.is_solid(next_step_gx, ground_level_gy) and not self.level.is_solid(wall_check_gx, enemy_mid_gy):
-                         self.vel_x *= -1
-        
+        # Turn around at ledges. Walls are handled by collision resolution (_on_wall).
+        if self._on_ground and self.vel_x and self.level.ledge_ahead(self.rect, self.vel_x):
+            self.vel_x *= -1
+
+        self._on_ground = False 
         self._move_axis(self.vel_x, self.vel_y)
+        self.reindex()
 
         if self.rect.top > self.level.height + TILE_SIZE * 3: # Increased leeway
             self.kill()
 
 
-class Item(pygame.sprite.Sprite):
+class SwarmEnemy:
+    """Handle to one enemy of an EnemySwarm. Only valid until the swarm next updates."""
+    __slots__ = ("swarm", "slot", "rect", "prev_pos")
+
+    def __init__(self, swarm, slot):
+        self.swarm = swarm
+        self.slot = slot
+        self.rect = pygame.Rect(int(swarm.x[slot]), int(swarm.y[slot]), TILE_SIZE, TILE_SIZE)
+        self.prev_pos = (int(swarm.prev_x[slot]), int(swarm.prev_y[slot]))
+
+    lerp_pos = IndexedSprite.lerp_pos
+
+    def draw(self, surface, cam_x, cam_y=0, alpha=1.0):
+        x, y = self.lerp_pos(alpha)
+        surface.blit(self.swarm.image, (x - cam_x, y - cam_y))
+
+    def kill(self):
+        self.swarm.kill(self.slot)
+
+class EnemySwarm:
+    """All enemies of a level simulated together in NumPy arrays.
+
+    Stands in for the enemy sprite group: update() runs the same steps as
+    Enemy.update for every enemy at once, in either physics mode. The
+    vectorised tile sweep assumes one-tile enemies moving at most a tile per
+    step, which ENEMY_SPEED and the terminal velocity guarantee. Enemies keep
+    the order they were added in.
+    """
+    def __init__(self):
+        self.image = sprite_images.get("block", (TILE_SIZE, TILE_SIZE), GREEN)
+        self.level = None
+        self._flags = None
+        self._nav = None
+        self.empty()
+
+    def empty(self):
+        self.x = numpy.zeros(0, dtype=numpy.int64) # Rect top-left, whole pixels like pygame.Rect
+        self.y = numpy.zeros(0, dtype=numpy.int64)
+        # Velocities keep the bound level's units, a restarted level is added to without rebinding
+        velocity_type = numpy.int64 if self.level is not None and self.physics.fixed_point else numpy.float64
+        self.vel_x = numpy.zeros(0, dtype=velocity_type)
+        self.vel_y = numpy.zeros(0, dtype=velocity_type)
+        self.on_ground = numpy.zeros(0, dtype=bool)
+        self.prev_x = numpy.zeros(0, dtype=numpy.int64)
+        self.prev_y = numpy.zeros(0, dtype=numpy.int64)
+        self.spawn_id = numpy.zeros(0, dtype=numpy.int64) # Game spawn record, -1 for none
+        self.sub_x = numpy.zeros(0, dtype=numpy.int64) # Sub-pixel remainders, fixed-point physics only
+        self.sub_y = numpy.zeros(0, dtype=numpy.int64)
+
+    def _bind(self, level):
+        self.level = level
+        self.physics = level.physics
+        velocity_type = numpy.int64 if level.physics.fixed_point else numpy.float64
+        self.vel_x = self.vel_x.astype(velocity_type)
+        self.vel_y = self.vel_y.astype(velocity_type)
+        # 2D view of the padded flag plane, follows set_tile without copying
+        self._flags = numpy.frombuffer(level.flags, dtype=numpy.uint8).reshape(-1, level.stride)
+        self._nav = numpy.frombuffer(level.nav, dtype=numpy.uint8).reshape(-1, level.stride)
+
+    def add(self, enemy):
+        """Takes over the state of an Enemy sprite, which is not kept."""
+        if enemy.level is not self.level:
+            self._bind(enemy.level)
+        def append(array, value):
+            return numpy.append(array, numpy.array([value], dtype=array.dtype))
+        self.x = append(self.x, enemy.rect.x)
+        self.y = append(self.y, enemy.rect.y)
+        self.vel_x = append(self.vel_x, enemy.vel_x)
+        self.vel_y = append(self.vel_y, enemy.vel_y)
+        self.on_ground = append(self.on_ground, enemy._on_ground)
+        self.prev_x = append(self.prev_x, enemy.rect.x)
+        self.prev_y = append(self.prev_y, enemy.rect.y)
+        self.spawn_id = append(self.spawn_id, -1 if enemy.spawn_id is None else enemy.spawn_id)
+        self.sub_x = append(self.sub_x, enemy.sub_x)
+        self.sub_y = append(self.sub_y, enemy.sub_y)
+
+    def _keep(self, mask):
+        for name in ("x", "y", "vel_x", "vel_y", "on_ground", "prev_x", "prev_y", "spawn_id", "sub_x", "sub_y"):
+            setattr(self, name, getattr(self, name)[mask])
+
+    def kill(self, slot: int):
+        mask = numpy.ones(len(self.x), dtype=bool)
+        mask[slot] = False
+        self._keep(mask)
+
+    def __len__(self):
+        return len(self.x)
+
+    def __iter__(self):
+        return (SwarmEnemy(self, slot) for slot in range(len(self.x)))
+
+    def snapshot(self):
+        self.prev_x = self.x.copy()
+        self.prev_y = self.y.copy()
+
+    def _solid(self, cols, rows):
+        """Per-enemy solidity of grid cells (cols, rows)."""
+        return (self._flags[rows + TILE_PAD, cols + self.level.col_offset] & TILE_SOLID) != 0
+
+    def update(self):
+        """One simulation step for every enemy, matching Enemy.update."""
+        if not len(self.x):
+            return
+        x, y = self.x, self.y
+        physics = self.physics
+        self.vel_y = numpy.minimum(self.vel_y + physics.gravity, physics.terminal_velocity)
+
+        # Grounded enemies turn around at ledges, one navigation map lookup each like Level.ledge_ahead
+        left = self.vel_x < 0
+        home_col = numpy.where(left, (x - 1) // TILE_SIZE + 1, (x + TILE_SIZE) // TILE_SIZE - 1)
+        stand_row = (y + TILE_SIZE) // TILE_SIZE - 1
+        ledge = self._nav[stand_row + TILE_PAD, home_col + self.level.col_offset] & numpy.where(left, NAV_LEDGE_LEFT, NAV_LEDGE_RIGHT)
+        self.vel_x = numpy.where(self.on_ground & (ledge != 0), -self.vel_x, self.vel_x)
+
+        # Horizontal sweep: at most one new column per step, turn around on a wall
+        if physics.fixed_point:
+            total = self.sub_x + self.vel_x
+            x1 = x + (total >> SUBPIXEL_SHIFT)
+            sub_x = total & (SUBPIXELS - 1)
+        else:
+            x1 = _round_coords(x + self.vel_x)
+        right = x1 > x
+        lead_col = numpy.where(right, (x1 + TILE_SIZE - 1) // TILE_SIZE, x1 // TILE_SIZE)
+        entered = numpy.where(right, lead_col > (x + TILE_SIZE - 1) // TILE_SIZE, lead_col < x // TILE_SIZE)
+        hit = entered & (self._solid(lead_col, y // TILE_SIZE) | self._solid(lead_col, (y + TILE_SIZE - 1) // TILE_SIZE))
+        x = numpy.where(hit, numpy.where(right, lead_col - 1, lead_col + 1) * TILE_SIZE, x1)
+        self.vel_x = numpy.where(hit, -self.vel_x, self.vel_x)
+        if physics.fixed_point:
+            self.sub_x = numpy.where(hit, 0, sub_x)
+
+        # Vertical sweep: land on floors, stop under ceilings
+        if physics.fixed_point:
+            total = self.sub_y + self.vel_y
+            y1 = y + (total >> SUBPIXEL_SHIFT)
+            sub_y = total & (SUBPIXELS - 1)
+        else:
+            y1 = _round_coords(y + self.vel_y)
+        down = y1 > y
+        lead_row = numpy.where(down, (y1 + TILE_SIZE - 1) // TILE_SIZE, y1 // TILE_SIZE)
+        entered = numpy.where(down, lead_row > (y + TILE_SIZE - 1) // TILE_SIZE, lead_row < y // TILE_SIZE)
+        hit = entered & (self._solid(x // TILE_SIZE, lead_row) | self._solid((x + TILE_SIZE - 1) // TILE_SIZE, lead_row))
+        y = numpy.where(hit, numpy.where(down, lead_row - 1, lead_row + 1) * TILE_SIZE, y1)
+        landed = hit & down
+        if physics.fixed_point:
+            # Resting exactly on the ground lands even when the fall was under a pixel, like Level.resting_on
+            floor_row = (y + TILE_SIZE) // TILE_SIZE
+            landed |= (~hit & (self.vel_y > 0) & (y % TILE_SIZE == 0) &
+                       (self._solid(x // TILE_SIZE, floor_row) | self._solid((x + TILE_SIZE - 1) // TILE_SIZE, floor_row)))
+            hit |= landed
+            self.sub_y = numpy.where(hit, 0, sub_y)
+        self.vel_y = numpy.where(hit, 0, self.vel_y)
+        self.on_ground = landed
+
+        self.x, self.y = x, y
+        alive = y <= self.level.height + TILE_SIZE * 3 # Fell off the map
+        if not alive.all():
+            self._keep(alive)
+
+    def sleep_outside(self, left: int, right: int) -> list:
+        """Removes enemies entirely outside world x range [left, right), returning their spawn ids."""
+        outside = (self.x + TILE_SIZE <= left) | (self.x >= right)
+        if not outside.any():
+            return []
+        slept = self.spawn_id[outside].tolist()
+        self._keep(~outside)
+        return slept
+
+    def collide(self, rect):
+        """First enemy overlapping rect, in spawn order like spritecollideany, or None."""
+        overlap = ((self.x < rect.right) & (self.x + TILE_SIZE > rect.left) &
+                   (self.y < rect.bottom) & (self.y + TILE_SIZE > rect.top))
+        slots = numpy.flatnonzero(overlap)
+        return SwarmEnemy(self, int(slots[0])) if len(slots) else None
+
+    def visible(self, view):
+        """Handles for the enemies overlapping the view rect."""
+        return [SwarmEnemy(self, int(slot)) for slot in
+                numpy.flatnonzero((self.x < view.right) & (self.x + TILE_SIZE > view.left) &
+                                  (self.y < view.bottom) & (self.y + TILE_SIZE > view.top))]
+
+def _round_coords(values):
+    """Rounds float coordinates to whole pixels the way pygame.Rect does (half away from zero)."""
+    return (numpy.sign(values) * numpy.floor(numpy.abs(values) + 0.5)).astype(numpy.int64)
+
+
+class Item(IndexedSprite):
     """Represents collectible items like mushrooms and coins."""
     def __init__(self, x: int, y: int, item_type: str, level: Level): # x, y are world coords
         super().__init__()
@@ -482,24 +1947,11 @@ class Item(pygame.sprite.Sprite):
         self._on_ground = False
 
         if self.type == "mushroom":
-            self.image = pygame.Surface([TILE_SIZE, TILE_SIZE])
-            self.image.fill(BRIGHT_RED)
-            # Simple eyes for mushroom
-            eye_radius = TILE_SIZE // 8
-            pygame.draw.circle(self.image, WHITE, (TILE_SIZE//2 - TILE_SIZE//4, TILE_SIZE//2 - TILE_SIZE//5), eye_radius)
-            pygame.draw.circle(self.image, WHITE, (TILE_SIZE//2 + TILE_SIZE//4, TILE_SIZE//2 - TILE_SIZE//5), eye_radius)
-            pygame.draw.circle(self.image, BLACK, (TILE_SIZE//2 - TILE_SIZE//4, TILE_SIZE//2 - TILE_SIZE//5), eye_radius//2)
-            pygame.draw.circle(self.image, BLACK, (TILE_SIZE//2 + TILE_SIZE//4, TILE_SIZE//2 - TILE_SIZE//5), eye_radius//2)
-
+            self.image = sprite_images.get("mushroom", (TILE_SIZE, TILE_SIZE), BRIGHT_RED)
             self.rect = self.image.get_rect(topleft=(x,y))
-            self.vel_x = MUSHROOM_SPEED 
+            self.vel_x = level.physics.mushroom_speed
         elif self.type == "coin":
-            self.image = pygame.Surface([TILE_SIZE // 2, TILE_SIZE // 2])
-            self.image.set_colorkey(BLACK) # Make background transparent if needed
-            self.image.fill(BLACK) # Fill with colorkey color first
-            pygame.draw.circle(self.image, YELLOW, (TILE_SIZE // 4, TILE_SIZE // 4), TILE_SIZE // 4)
-            pygame.draw.circle(self.image, GOLD, (TILE_SIZE // 4, TILE_SIZE // 4), TILE_SIZE // 5, width=1) # Outline
-            
+            self.image = sprite_images.get("coin", (TILE_SIZE // 2, TILE_SIZE // 2), YELLOW)
             self.rect = self.image.get_rect(topleft=(x,y))
             self.rect.centerx = x + TILE_SIZE // 2 
             self.rect.centery = y + TILE_SIZE // 2
@@ -508,56 +1960,34 @@ class Item(pygame.sprite.Sprite):
         self.initial_y = y 
 
     def update(self):
+        physics = self.level.physics
         if self.type == "mushroom":
-            self.vel_y += GRAVITY
-            if self.vel_y > TILE_SIZE: self.vel_y = TILE_SIZE
+            self.vel_y += physics.gravity
+            if self.vel_y > physics.terminal_velocity: self.vel_y = physics.terminal_velocity
             
             self._on_ground = False
             
-            # Mushroom X movement and collision (simplified from Entity)
-            self.rect.x += self.vel_x
-            left_tile = self.rect.left // TILE_SIZE
-            right_tile = (self.rect.right - 1) // TILE_SIZE
-            top_tile = self.rect.top // TILE_SIZE
-            bottom_tile = (self.rect.bottom - 1) // TILE_SIZE
-
-            for gy in range(top_tile, bottom_tile + 1):
-                for gx in range(left_tile, right_tile + 1):
-                    if self.level.is_solid(gx, gy):
-                        tile_rect = pygame.Rect(gx * TILE_SIZE, gy * TILE_SIZE, TILE_SIZE, TILE_SIZE)
-                        if self.rect.colliderect(tile_rect):
-                            if self.vel_x > 0: self.rect.right = tile_rect.left
-                            elif self.vel_x < 0: self.rect.left = tile_rect.right
-                            self.vel_x *= -1 
-                            break 
-                if self.vel_x == 0 and self.type == "mushroom": # Unstick
-                     self.vel_x = MUSHROOM_SPEED if pygame.time.get_ticks() % 2 == 0 else -MUSHROOM_SPEED
-
-            # Mushroom Y movement and collision
-            self.rect.y += self.vel_y
-            left_tile = self.rect.left // TILE_SIZE # Recheck after x-move
-            right_tile = (self.rect.right - 1) // TILE_SIZE
-            top_tile = self.rect.top // TILE_SIZE
-            bottom_tile = (self.rect.bottom - 1) // TILE_SIZE
-            for gy in range(top_tile, bottom_tile + 1):
-                for gx in range(left_tile, right_tile + 1):
-                    if self.level.is_solid(gx, gy):
-                        tile_rect = pygame.Rect(gx * TILE_SIZE, gy * TILE_SIZE, TILE_SIZE, TILE_SIZE)
-                        if self.rect.colliderect(tile_rect):
-                            if self.vel_y > 0: 
-                                self.rect.bottom = tile_rect.top
-                                self._on_ground = True
-                            elif self.vel_y < 0: self.rect.top = tile_rect.bottom
-                            self.vel_y = 0
-                            break
+            # Mushroom movement uses the same swept tile solver as Entity
+            landed = self.vel_y > 0
+            x_hit, y_hit = self._sweep(self.vel_x, self.vel_y)
+            if x_hit is not None:
+                self.vel_x *= -1 # Bounce off walls
+            if y_hit is not None:
+                self._on_ground = landed
+                self.vel_y = 0
             
             if self.rect.top > self.level.height + TILE_SIZE * 5: 
                 self.kill() 
 
         elif self.type == "coin":
             if self.vel_y != 0 : # Initial pop
-                self.rect.y += self.vel_y
-                self.vel_y += GRAVITY * 0.5 
+                if physics.fixed_point:
+                    total = self.sub_y + self.vel_y
+                    self.rect.y += total >> SUBPIXEL_SHIFT
+                    self.sub_y = total & (SUBPIXELS - 1)
+                else:
+                    self.rect.y += self.vel_y
+                self.vel_y += physics.coin_gravity
                 if self.rect.y > self.initial_y : 
                     self.rect.y = self.initial_y
                     self.vel_y = 0
@@ -567,15 +1997,18 @@ class Item(pygame.sprite.Sprite):
                 if self.lifetime <=0:
                     self.kill() 
 
-    def draw(self, surface, cam_x): # Items need cam_x for drawing
-        draw_rect = self.rect.copy()
-        draw_rect.x -= cam_x
-        surface.blit(self.image, draw_rect)
+        self.reindex()
+
+    def draw(self, surface, cam_x, cam_y=0, alpha=1.0): # Items need the camera offsets for drawing
+        x, y = self.lerp_pos(alpha)
+        surface.blit(self.image, (x - cam_x, y - cam_y))
 
 
 class Game:
     """Main game class orchestrating everything."""
-    def __init__(self):
+    def __init__(self, dirty_rects=False, tile_renderer="chunks", display_mode="native", window_size=None,
+                 max_fps=FPS, enemy_engine="sprites", activation=True, physics="float",
+                 level_cache=True, streaming=False, prefetch=True):
         pygame.init()
         try:
             pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
@@ -585,8 +2018,35 @@ class Game:
             print("Warning: Pygame mixer could not be initialized. Sounds will be disabled.")
 
         pygame.display.set_caption("Super Platformer Engine")
-        self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        self._create_display(display_mode, window_size)
+        if dirty_rects and display_mode == "integer":
+            print("Warning: Dirty rects are not supported with integer scaling. Presenting full frames.")
+            dirty_rects = False
+        # Optional dirty-rect presentation; None means a full flip every frame
+        self.renderer = DirtyRectRenderer(self.screen) if dirty_rects else None
+        self._last_scene_key = None
+        self._last_drawn_cam = None
         self.clock = pygame.time.Clock()
+        self.max_fps = max_fps # Render rate cap, 0 renders as fast as possible
+        if tile_renderer == "numpy" and numpy is None:
+            print("Warning: NumPy is not installed. Falling back to the chunk tile renderer.")
+            tile_renderer = "chunks"
+        self.tile_renderer = tile_renderer
+        self.physics = physics # Key of PHYSICS_MODES, passed to every Level
+        self.level_cache = level_cache # Load levels through the compiled, memory-mapped cache
+        if streaming and not level_cache:
+            print("Warning: Level streaming needs the level cache. Loading whole levels.")
+            streaming = False
+        if streaming and not activation:
+            print("Warning: Level streaming parks entities with their chunks. Keeping activation on.")
+            activation = True
+        self.streaming = streaming # Page levels in by column chunks around the player, see _stream_level
+        # Builds the levels likely to be entered next while the overworld or level clear screen shows
+        self.prefetcher = LevelPrefetcher(self._build_level) if prefetch else None
+        if enemy_engine == "numpy" and numpy is None:
+            print("Warning: NumPy is not installed. Falling back to enemy sprites.")
+            enemy_engine = "sprites"
+        self.enemy_engine = enemy_engine
         self.font_manager = FontManager()
         self.running = True
         self.game_state = START_MENU
@@ -595,18 +2055,72 @@ class Game:
         self.current_level_idx = 1
         
         self.level = None
+        self._level_key = None # (world, level) self.level was built for
         self.player = None # Will be initialized in _load_level_data or reset_game
-        self.enemies = pygame.sprite.Group() 
+        # Enemy sprites, or one EnemySwarm standing in for the group with --enemy-engine numpy
+        self.enemies = EnemySwarm() if enemy_engine == "numpy" else pygame.sprite.Group()
         self.items = pygame.sprite.Group()   
+        # Spatial hashes of the groups, used for collision broadphase and to cull drawing to the viewport
+        self.enemy_index = SpatialHash()
+        self.item_index = SpatialHash()
+        # Placed enemies and items as spawn records; see _update_activation
+        self.activation = activation # False simulates every placed entity from level start
+        self._spawns = {} # Spawn id -> (entity kind, grid x, grid y), for the level's resident chunks
+        self._spawn_awake = {} # Spawn id -> 1 once woken, back to 0 when it sleeps; never woken when missing
+        self._spawn_columns = {} # Grid x -> spawn ids in that column
+        self._chunk_spawns = {} # Level chunk -> its spawn ids; a whole level is chunk 0
+        self._wake_columns = None # Column range [first, last) the wake region covered last step
+        self.wakes = 0 # Activation totals, for tuning the margins
+        self.sleeps = 0
+        self.broadphase_pairs = 0 # Candidate pairs the hashes tested in the last step
+        self._broadphase_total = 0
+        self._broadphase_steps = 0
+        self.sprites_drawn = 0 # Per-frame culling stats
+        self.sprites_culled = 0
+        self._drawn_sprites = []
 
         self.cam_x = 0
+        self.cam_y = 0
+        self.prev_cam = (0, 0) # Camera before the last simulation step
+        self.view_x = 0 # Interpolated camera used for the frame being drawn
+        self.view_y = 0
+        self._alpha = 1.0
         self._load_sounds()
 
         # Overworld state
         self.overworld_cursor_node_key = (1,1) # Start at level 1-1
         self.unlocked_levels = set([(1,1)]) # Initially only 1-1 is unlocked
         self.cleared_levels = set() # Track cleared levels e.g. (world_idx, level_idx)
+        self._overworld_layer = None # Baked paths/nodes/labels, None when it needs a re-bake
+        self._overworld_node_colors = {}
+
+
+    def _create_display(self, display_mode, window_size):
+        """Sets up self.screen, the WIDTH x HEIGHT surface everything is drawn to.
+
+        Drawing cost only depends on the logical size; the window size only
+        affects the final scale step.
+        """
+        self.display_mode = display_mode
+        self._scaled_frame = None
+        if display_mode == "scaled":
+            self.screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.SCALED)
+        elif display_mode == "integer":
+            self.window = pygame.display.set_mode(window_size or (WIDTH, HEIGHT))
+            self.window.fill(BLACK) # Letterbox bars, never drawn over
+            self.screen = pygame.Surface((WIDTH, HEIGHT)).convert()
+            window_w, window_h = self.window.get_size()
+            scale = max(1, min(window_w // WIDTH, window_h // HEIGHT))
+            self._scaled_frame = pygame.Surface((WIDTH * scale, HEIGHT * scale)).convert()
+            self._scaled_rect = self._scaled_frame.get_rect(center=self.window.get_rect().center)
+        else:
+            self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
 
+    def _upscale(self):
+        """Integer mode: scales the logical frame into the letterboxed window."""
+        if self._scaled_frame is not None:
+            pygame.transform.scale(self.screen, self._scaled_frame.get_size(), self._scaled_frame)
+            self.window.blit(self._scaled_frame, self._scaled_rect)
 
     def _load_sounds(self):
         self.sounds = {
@@ -634,14 +2148,14 @@ class Game:
         #     print(f"Debug: Sound '{sound_name}' not found or not loaded, or sounds disabled.")
 
 
-    def _find_spawn_points(self, char_to_find: str) -> list[tuple[int, int]]:
-        spawns = []
-        if not self.level: return spawns
-        for y, row in enumerate(self.level.tilemap):
-            for x, cell in enumerate(row):
-                if cell == char_to_find:
-                    spawns.append((x, y))
-        return spawns
+    def spawn_enemy(self, enemy):
+        self.enemies.add(enemy)
+        if self.enemy_engine == "sprites": # The swarm culls itself
+            self.enemy_index.add(enemy)
+
+    def spawn_item(self, item):
+        self.items.add(item)
+        self.item_index.add(item)
 
     def _load_level_data(self, world_idx, level_idx):
         """Loads the tilemap and initializes player, enemies, items for the chosen level."""
@@ -656,9 +2170,18 @@ class Game:
             self.game_state = OVERWORLD # Go back to overworld to prevent crash
             return False
 
-        self.level = Level(tilemap_str_list)
+        if self.level is not None and self._level_key == (world_idx, level_idx):
+            self.level.rollback() # Entering the same level again: undo its tile changes instead of reloading
+        else:
+            if self.level is not None and self.level.streamed:
+                self.level.close()
+            self.level = self.prefetcher.take((world_idx, level_idx)) if self.prefetcher else None
+            if self.level is None:
+                self.level = self._build_level((world_idx, level_idx))
+            self._level_key = (world_idx, level_idx)
+        self.level.track_changes = self.renderer is not None
         
-        player_spawns = self._find_spawn_points("P")
+        player_spawns = self.level.spawns["player"] # Spawn tables come from the level's single ingest pass
         player_spawn_x, player_spawn_y = (1, self.level.rows - 3) if not player_spawns else player_spawns[0]
         
         # If player exists (from previous level), update its state, else create new
@@ -672,36 +2195,69 @@ class Game:
             self.player.initial_spawn_y_tile = player_spawn_y
             self.player.respawn() # Resets position, powerup, image to small
 
-        self.enemies.empty() 
-        enemy_spawns = self._find_spawn_points("E")
-        for ex, ey in enemy_spawns:
-            self.enemies.add(Enemy(ex, ey, self.level))
+        self._reset_entities()
 
-        self.items.empty() 
-        # Directly placed coins
-        coin_spawns = self._find_spawn_points("C")
-        for cx, cy in coin_spawns:
-            coin = Item(cx * TILE_SIZE, cy*TILE_SIZE, "coin", self.level)
-            coin.vel_y = 0 
-            coin.lifetime = float('inf') 
-            self.items.add(coin)
-            if 0 <= cy < self.level.rows and 0 <= cx < self.level.cols:
-                 self.level.tilemap[cy][cx] = '.' 
-        
-        # Directly placed mushrooms (for testing)
-        mushroom_spawns = self._find_spawn_points("M")
-        for mx, my in mushroom_spawns:
-            mushroom = Item(mx * TILE_SIZE, my*TILE_SIZE, "mushroom", self.level)
-            self.items.add(mushroom)
-            if 0 <= my < self.level.rows and 0 <= mx < self.level.cols:
-                self.level.tilemap[my][mx] = '.'
+        # Tile chunks are baked lazily as they first scroll into view, so load time doesn't grow with level size
 
         self.cam_x = 0
+        self.cam_y = 0
+        self.prev_cam = (0, 0)
+        self._update_activation()
         if self.player: self.player.on_goal = False
         self.game_state = PLAYING
         return True
 
 
+    def _reset_entities(self):
+        """Removes every enemy and item and puts the level's placed ones back as dormant spawn records."""
+        self.enemies.empty() 
+        self.enemy_index.clear()
+        self.items.empty() 
+        self.item_index.clear()
+        # Placed enemies and mushrooms start dormant as spawn records, a streamed level's come with its chunks.
+        # Placed coins stay in the level's collectible layer ('C' tiles), see Level.collect_coins.
+        self._spawns = {}
+        self._spawn_awake = {}
+        self._spawn_columns = {}
+        self._chunk_spawns = {}
+        self._wake_columns = None
+        if self.level.streamed:
+            for chunk, records in self.level.resident_spawns():
+                self._add_spawns(chunk, records)
+            self._stream_level()
+        else:
+            self._add_spawns(0, [(kind, x, y) for kind, cells in self.level.spawns.items() if kind != "player"
+                                 for x, y in cells])
+        if not self.activation:
+            for spawn_id in list(self._spawns):
+                self._wake(spawn_id)
+
+    def restart_level(self):
+        """Resets the level after the player lost a life, like SMW: broken blocks, used ? blocks and
+        collected coins come back from the level's journal and placed enemies and items respawn.
+        Costs O(changes + entities), nothing is reloaded. The player keeps its checkpoint.
+        """
+        self.level.rollback()
+        self._reset_entities()
+
+    def _build_level(self, level_key) -> Level:
+        """Builds a fresh Level for (world, level). Also runs on the prefetch worker thread."""
+        tilemap_str_list = worlds[level_key[0]]["levels"][level_key[1]]
+        if self.level_cache:
+            return load_level(tilemap_str_list, self.tile_renderer, self.physics, streamed=self.streaming)
+        return Level(tilemap_str_list, self.tile_renderer, self.physics)
+
+    def _prefetch_levels(self):
+        """Queues the levels likely to be entered next: the one under the overworld cursor and the one after a clear."""
+        if self.prefetcher is None:
+            return
+        if self.overworld_cursor_node_key != self._level_key: # The loaded level restarts with a rollback
+            self.prefetcher.request(self.overworld_cursor_node_key)
+        if self.game_state == LEVEL_CLEAR:
+            current_node_data = overworld_nodes.get((self.current_world_idx, self.current_level_idx))
+            if current_node_data and current_node_data["next"] in overworld_nodes:
+                self.prefetcher.request(current_node_data["next"]) # Most recent request, built first
+
     def _handle_input(self):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -734,10 +2290,6 @@ class Game:
                         self.reset_game_stats()
                         self.game_state = START_MENU
 
-        if self.game_state == PLAYING and self.player:
-            keys = pygame.key.get_pressed()
-            self.player.update(keys, self)
-
     def _handle_input_overworld(self, event):
         """Handles input for the overworld map."""
         current_node_data = overworld_nodes.get(self.overworld_cursor_node_key)
@@ -774,38 +2326,175 @@ class Game:
                 # game_state is set to PLAYING by _load_level_data on success
 
 
+    def _snapshot(self):
+        """Records positions before a simulation step so rendering can interpolate."""
+        self.prev_cam = (self.cam_x, self.cam_y)
+        self.player.snapshot()
+        if self.enemy_engine == "numpy": self.enemies.snapshot()
+        else:
+            for enemy in self.enemies: enemy.snapshot()
+        for item in self.items: item.snapshot()
+
+    def _wake(self, spawn_id: int):
+        """Creates the entity for a dormant spawn record at its spawn tile."""
+        kind, x, y = self._spawns[spawn_id]
+        if kind == "enemy":
+            entity = Enemy(x, y, self.level)
+        elif kind == "mushroom": # Directly placed mushrooms (for testing)
+            entity = Item(x * TILE_SIZE, y * TILE_SIZE, "mushroom", self.level)
+        else:
+            raise ValueError(f"Unknown spawn kind: {kind}")
+        entity.spawn_id = spawn_id
+        entity.snapshot()
+        self._spawn_awake[spawn_id] = 1
+        self.wakes += 1
+        if kind == "enemy": self.spawn_enemy(entity)
+        else: self.spawn_item(entity)
+
+    def _add_spawns(self, chunk: int, records: list):
+        """Registers the spawn records of a level chunk. Their ids stay the same whenever the chunk comes back."""
+        spawn_ids = []
+        for number, record in enumerate(records):
+            spawn_id = (chunk << 20) + number
+            self._spawns[spawn_id] = record
+            self._spawn_columns.setdefault(record[1], []).append(spawn_id)
+            spawn_ids.append(spawn_id)
+        self._chunk_spawns[chunk] = spawn_ids
+        return spawn_ids
+
+    def _drop_spawns(self, chunk: int):
+        """Forgets the spawn records of an evicted chunk. Which ones were used up is kept."""
+        for spawn_id in self._chunk_spawns.pop(chunk, ()):
+            if not self._spawn_awake.get(spawn_id):
+                self._spawn_awake.pop(spawn_id, None)
+            kind, x, y = self._spawns.pop(spawn_id)
+            column = self._spawn_columns[x]
+            column.remove(spawn_id)
+            if not column: del self._spawn_columns[x]
+
+    def _stream_level(self):
+        """Pages in the level chunks around the player and parks what the moved window left behind.
+
+        The columns asked for reach a screen and the sleep margin past the player on both sides,
+        which holds the camera's whole sleep region however the camera is clamped. Entities outside
+        the window after it moved are parked like sleeping ones; records of newly loaded chunks that
+        are already inside the wake region wake straight away.
+        """
+        column = self.player.rect.centerx // TILE_SIZE
+        reach = (WIDTH + ACTIVATION_SLEEP_MARGIN) // TILE_SIZE + 2
+        loaded, evicted = self.level.stream(column - reach, column + reach)
+        if not loaded and not evicted:
+            return
+        self._sleep_outside(self.level.first_resident_col * TILE_SIZE, self.level.last_resident_col * TILE_SIZE)
+        for chunk in evicted:
+            self._drop_spawns(chunk)
+        for chunk, records in loaded:
+            for spawn_id in self._add_spawns(chunk, records):
+                x = self._spawns[spawn_id][1]
+                if (self._wake_columns is not None and self._wake_columns[0] <= x < self._wake_columns[1] and
+                        not self._spawn_awake.get(spawn_id)):
+                    self._wake(spawn_id)
+
+    def _sleep(self, sprite):
+        """Despawns an entity that left the sleep region. Placed ones can wake again at their spawn tile."""
+        if sprite.spawn_id is not None:
+            self._spawn_awake[sprite.spawn_id] = 0
+        sprite.kill()
+        self.sleeps += 1
+
+    def _update_activation(self):
+        """Wakes spawn records scrolling into the wake region and despawns entities far outside the camera.
+
+        Only columns that just entered the wake region are looked at, so dormant records cost nothing
+        while the camera stands still. A record whose entity was stomped, collected or fell stays awake
+        and never respawns.
+        """
+        if not self.activation:
+            return
+        self._sleep_outside(self.cam_x - ACTIVATION_SLEEP_MARGIN, self.cam_x + WIDTH + ACTIVATION_SLEEP_MARGIN)
+
+        first = (self.cam_x - ACTIVATION_WAKE_MARGIN) // TILE_SIZE
+        last = (self.cam_x + WIDTH + ACTIVATION_WAKE_MARGIN - 1) // TILE_SIZE + 1
+        previous = self._wake_columns
+        if previous == (first, last):
+            return
+        self._wake_columns = (first, last)
+        for column in range(first, last):
+            if previous is not None and previous[0] <= column < previous[1]:
+                continue # Was already inside the region, its records woke or stayed asleep then
+            for spawn_id in self._spawn_columns.get(column, ()):
+                if not self._spawn_awake.get(spawn_id):
+                    self._wake(spawn_id)
+
+    def _sleep_outside(self, left: int, right: int):
+        """Puts to sleep every entity entirely outside world x range [left, right)."""
+        for group in (self.items, self.enemies) if self.enemy_engine == "sprites" else (self.items,):
+            for sprite in group.sprites():
+                if sprite.rect.right <= left or sprite.rect.left >= right:
+                    self._sleep(sprite)
+        if self.enemy_engine == "numpy":
+            for spawn_id in self.enemies.sleep_outside(left, right):
+                if spawn_id >= 0: self._spawn_awake[spawn_id] = 0
+                self.sleeps += 1
+
+    def activation_stats(self) -> dict:
+        active = len(self.enemies) + len(self.items)
+        dormant = sum(1 for spawn_id in self._spawns if not self._spawn_awake.get(spawn_id))
+        return {"active": active, "dormant": dormant, "wakes": self.wakes, "sleeps": self.sleeps}
+
+    def _enemy_touching_player(self):
+        """First enemy overlapping the player, or None. Either engine's result has .rect and .kill()."""
+        if self.enemy_engine == "numpy":
+            return self.enemies.collide(self.player.rect)
+        return self.enemy_index.collide_any(self.player.rect)
+
     def _update(self):
+        """Advances the game by one fixed 1/FPS simulation step."""
+        if self.game_state in (OVERWORLD, LEVEL_CLEAR):
+            self._prefetch_levels()
         if self.game_state != PLAYING or not self.player or not self.level:
             return
 
-        # self.player.update is called in _handle_input based on keys
+        self._snapshot()
+        self.player.update(pygame.key.get_pressed(), self)
+        if self.game_state != PLAYING: return # Player ran out of lives
         self.enemies.update()
         self.items.update()
 
         # Player-Enemy collisions
         if self.player.invincible_timer == 0:
-            # Pass self.enemies (the group) to spritecollideany
-            enemy_collided = pygame.sprite.spritecollideany(self.player, self.enemies)
+            enemy_collided = self._enemy_touching_player()
             if enemy_collided:
-                stomp_threshold = self.player.vel_y + GRAVITY + 5 
+                physics = self.level.physics # Velocities are in physics.scale units per pixel
+                stomp_threshold = self.player.vel_y + physics.gravity + 5 * physics.scale
                 is_stomp = (self.player.vel_y > 0 and 
                             self.player.rect.bottom < enemy_collided.rect.centery + TILE_SIZE * 0.5 and # Allow slightly deeper stomp
-                            abs(self.player.rect.bottom - enemy_collided.rect.top) < stomp_threshold)
+                            abs(self.player.rect.bottom - enemy_collided.rect.top) * physics.scale < stomp_threshold)
 
                 if is_stomp:
                     enemy_collided.kill() 
                     self.player.score += 100
-                    self.player.vel_y = PLAYER_JUMP_VELOCITY * 0.6 # Bounce
+                    self.player.vel_y = physics.stomp_bounce # Bounce
                     self.play_sound("stomp")
                 else:
                     self.player.take_damage(self) 
 
+        # Warps and respawns may have moved the player out of a streamed level's window, follow it
+        # before anything reads tiles around the player again
+        if self.level.streamed: self._stream_level()
+
         # Player-Item collisions
-        # Pass self.items (the group) to spritecollide
-        items_collected_list = pygame.sprite.spritecollide(self.player, self.items, True) # True to dokill
+        items_collected_list = self.item_index.collide(self.player.rect)
         for item_collected in items_collected_list:
+            item_collected.kill() # Leaves the group and the index
             self.player.collect_item(item_collected, self)
-            # Item is already removed from self.items group by spritecollide
+        for _ in range(self.level.collect_coins(self.player.rect)): # Placed coins
+            self.player.collect_coin(self)
+
+        self.broadphase_pairs = self.enemy_index.pairs_tested + self.item_index.pairs_tested
+        self.enemy_index.pairs_tested = self.item_index.pairs_tested = 0
+        self._broadphase_total += self.broadphase_pairs
+        self._broadphase_steps += 1
 
         # Remove enemies that fell off map (already handled in Enemy.update with self.kill())
         
@@ -813,11 +2502,16 @@ class Game:
         target_cam_x = self.player.rect.centerx - WIDTH // 2
         self.cam_x = max(0, min(target_cam_x, self.level.width - WIDTH))
         if self.level.width <= WIDTH: self.cam_x = 0
+        target_cam_y = self.player.rect.centery - HEIGHT // 2
+        self.cam_y = max(0, min(target_cam_y, self.level.height - HEIGHT))
+        if self.level.height <= HEIGHT: self.cam_y = 0
+        self._update_activation()
 
         if self.player.on_goal:
             self.game_state = LEVEL_CLEAR
             self.play_sound("level_clear_sound")
             self.cleared_levels.add((self.current_world_idx, self.current_level_idx))
+            self._invalidate_overworld()
             
             # Unlock next level
             current_node_data = overworld_nodes.get((self.current_world_idx, self.current_level_idx))
@@ -841,16 +2535,26 @@ class Game:
 
 
     def _draw_hud(self):
-        if not self.player: return
-        self.font_manager.render(self.screen, f"Score: {self.player.score}", (10, 10), WHITE)
-        self.font_manager.render(self.screen, f"Lives: {self.player.lives}", (WIDTH - 150, 10), WHITE)
-        self.font_manager.render(self.screen, f"World: {self.current_world_idx}-{self.current_level_idx}", (WIDTH // 2 - 70, 10), WHITE, center=False)
+        """Draws the HUD and returns the screen rects it covers."""
+        if not self.player: return []
+        return [
+            self.font_manager.render(self.screen, f"Score: {self.player.score}", (10, 10), WHITE),
+            self.font_manager.render(self.screen, f"Lives: {self.player.lives}", (WIDTH - 150, 10), WHITE),
+            self.font_manager.render(self.screen, f"World: {self.current_world_idx}-{self.current_level_idx}", (WIDTH // 2 - 70, 10), WHITE, center=False),
+        ]
+
+    def _invalidate_overworld(self):
+        """Call whenever unlocked_levels or cleared_levels change."""
+        self._overworld_layer = None
+
+    def _bake_overworld_layer(self):
+        """Renders the static part of the overworld: background, paths, nodes and labels."""
+        layer = pygame.Surface((WIDTH, HEIGHT))
+        if pygame.display.get_surface():
+            layer = layer.convert()
+        layer.fill(GRASS_GREEN) # A green background for the map
+        self.font_manager.render(layer, "Select Level", (WIDTH // 2, 50), WHITE, "medium", center=True)
 
-    def _draw_overworld(self):
-        """Draws the overworld map screen."""
-        self.screen.fill(GRASS_GREEN) # A green background for the map
-        self.font_manager.render(self.screen, "Select Level", (WIDTH // 2, 50), WHITE, "medium", center=True)
-        
         # Draw paths (simple lines between connected nodes for now)
         # This could be more sophisticated with actual path graphics
         for node_key, node_data in overworld_nodes.items():
@@ -859,32 +2563,113 @@ class Game:
                 end_pos = overworld_nodes[node_data["next"]]["pos"]
                 # Draw path only if both current and next are unlocked
                 if node_key in self.unlocked_levels and node_data["next"] in self.unlocked_levels:
-                     pygame.draw.line(self.screen, PATH_YELLOW, start_pos, end_pos, 5)
+                     pygame.draw.line(layer, PATH_YELLOW, start_pos, end_pos, 5)
 
         # Draw level nodes
+        self._overworld_node_colors = {}
         for node_key, node_data in overworld_nodes.items():
-            pos = node_data["pos"]
-            name = node_data["name"]
-            node_radius = 20
-            
             color = LEVEL_NODE_COLOR
             if node_key not in self.unlocked_levels:
                 color = (100,100,100) # Grey out locked levels
             elif node_key in self.cleared_levels:
                 color = LEVEL_NODE_CLEARED_COLOR
-            
-            if node_key == self.overworld_cursor_node_key and node_key in self.unlocked_levels:
-                pygame.draw.circle(self.screen, LEVEL_NODE_HIGHLIGHT_COLOR, pos, node_radius + 5) # Highlight
+            self._overworld_node_colors[node_key] = color
+            self._draw_overworld_node(layer, node_key, color)
 
-            pygame.draw.circle(self.screen, color, pos, node_radius)
-            self.font_manager.render(self.screen, name, (pos[0], pos[1] + node_radius + 5), WHITE, "small", center=True)
+        self.font_manager.render(layer, "Use Arrow Keys to Move, ENTER to Select", (WIDTH // 2, HEIGHT - 50), WHITE, "small", center=True)
+        self.font_manager.render(layer, "ESC to Title (from game) or Quit", (WIDTH // 2, HEIGHT - 25), WHITE, "small", center=True)
+        self._overworld_layer = layer
 
-        self.font_manager.render(self.screen, "Use Arrow Keys to Move, ENTER to Select", (WIDTH // 2, HEIGHT - 50), WHITE, "small", center=True)
-        self.font_manager.render(self.screen, "ESC to Title (from game) or Quit", (WIDTH // 2, HEIGHT - 25), WHITE, "small", center=True)
+    def _draw_overworld_node(self, surface, node_key, color):
+        pos = overworld_nodes[node_key]["pos"]
+        pygame.draw.circle(surface, color, pos, OVERWORLD_NODE_RADIUS)
+        self.font_manager.render(surface, overworld_nodes[node_key]["name"], (pos[0], pos[1] + OVERWORLD_NODE_RADIUS + 5), WHITE, "small", center=True)
+
+    def _draw_overworld(self):
+        """Draws the overworld map screen: the cached static layer plus the cursor highlight."""
+        if self._overworld_layer is None:
+            self._bake_overworld_layer()
+        self.screen.blit(self._overworld_layer, (0, 0))
+
+        node_key = self.overworld_cursor_node_key
+        if node_key in self.unlocked_levels and node_key in overworld_nodes:
+            pos = overworld_nodes[node_key]["pos"]
+            pygame.draw.circle(self.screen, LEVEL_NODE_HIGHLIGHT_COLOR, pos, OVERWORLD_NODE_RADIUS + 5) # Highlight
+            self._draw_overworld_node(self.screen, node_key, self._overworld_node_colors[node_key])
+
+
+    def _scene_key(self):
+        """Everything a non-playing screen depends on. Unchanged key means an unchanged screen."""
+        score = self.player.score if self.player else None
+        return (self.game_state, score, self.overworld_cursor_node_key,
+                len(self.unlocked_levels), len(self.cleared_levels))
+
+    def _visible_sprites(self, index):
+        """Sprites from index whose rect overlaps the viewport this frame."""
+        view = pygame.Rect(self.view_x, self.view_y, WIDTH, HEIGHT)
+        return [sprite for sprite in index.query(view) if view.colliderect(sprite.rect)]
+
+    def _draw_sprites(self):
+        """Draws on-screen items and enemies, culling the rest, and records the counts."""
+        visible_items = self._visible_sprites(self.item_index)
+        if self.enemy_engine == "numpy":
+            visible_enemies = self.enemies.visible(pygame.Rect(self.view_x, self.view_y, WIDTH, HEIGHT))
+        else:
+            visible_enemies = self._visible_sprites(self.enemy_index)
+        for item in visible_items: item.draw(self.screen, self.view_x, self.view_y, self._alpha)
+        for enemy in visible_enemies: enemy.draw(self.screen, self.view_x, self.view_y, self._alpha)
+
+        self._drawn_sprites = visible_items + visible_enemies
+        self.sprites_drawn = len(self._drawn_sprites)
+        self.sprites_culled = len(self.items) + len(self.enemies) - self.sprites_drawn
+
+    def _sprite_screen_rects(self):
+        """Screen rects of everything that can move while the camera stands still."""
+        offset = (-self.view_x, -self.view_y)
+        rects = [pygame.Rect(sprite.lerp_pos(self._alpha), sprite.rect.size).move(offset)
+                 for sprite in self._drawn_sprites + [self.player]]
+        rects.extend(tile_rect.move(offset) for tile_rect in self.level.changed_tiles)
+        self.level.changed_tiles.clear()
+        return rects
+
+    def _present(self, hud_rects):
+        """Pushes the frame to the display, using dirty rects when enabled."""
+        if self.renderer is None:
+            self._upscale()
+            pygame.display.flip()
+            return
 
+        if self.game_state != PLAYING or not self.level or not self.player:
+            self.renderer.present_full() # _draw skips unchanged static screens before getting here
+            self._last_scene_key = self._scene_key()
+            self._last_drawn_cam = None
+            return
+
+        # Any camera movement shifts every tile on screen, so that needs a full flip
+        first_playing_frame = self._last_scene_key != PLAYING
+        if first_playing_frame or (self.view_x, self.view_y) != self._last_drawn_cam:
+            self.level.changed_tiles.clear()
+            self.renderer.present_full()
+        else:
+            self.renderer.present(self._sprite_screen_rects() + hud_rects)
+        self._last_scene_key = PLAYING
+        self._last_drawn_cam = (self.view_x, self.view_y)
+
+    def _draw(self, alpha=1.0):
+        """Draws a frame, interpolating moving things alpha of the way through the current step."""
+        self._alpha = alpha
+        prev_cam_x, prev_cam_y = self.prev_cam
+        self.view_x = round(prev_cam_x + (self.cam_x - prev_cam_x) * alpha)
+        self.view_y = round(prev_cam_y + (self.cam_y - prev_cam_y) * alpha)
+
+        # Static screens are only redrawn when something they show has changed
+        if (self.renderer is not None and self.game_state != PLAYING
+                and self._scene_key() == self._last_scene_key):
+            self.renderer.present_none()
+            return
 
-    def _draw(self):
         self.screen.fill(SKY_BLUE) 
+        hud_rects = []
 
         if self.game_state == START_MENU:
             self.font_manager.render(self.screen, "Super Platformer Engine", (WIDTH // 2, HEIGHT // 3), GOLD, "large", center=True)
@@ -895,13 +2680,10 @@ class Game:
 
         elif self.game_state == PLAYING:
             if self.level and self.player:
-                self.level.draw(self.screen, self.cam_x)
-                # Items and enemies are sprite groups, they handle their own draw if added to a group
-                # But they need cam_x passed to their draw method.
-                for item in self.items: item.draw(self.screen, self.cam_x)
-                for enemy in self.enemies: enemy.draw(self.screen, self.cam_x)
-                self.player.draw(self.screen, self.cam_x) # Player draw handles invincibility blink
-                self._draw_hud()
+                self.level.draw(self.screen, self.view_x, self.view_y)
+                self._draw_sprites()
+                self.player.draw(self.screen, self.view_x, self.view_y, alpha) # Player draw handles invincibility blink
+                hud_rects = self._draw_hud()
 
         elif self.game_state == LEVEL_CLEAR:
             self.font_manager.render(self.screen, "Level Clear!", (WIDTH // 2, HEIGHT // 3), GREEN, "large", center=True)
@@ -921,7 +2703,7 @@ class Game:
                 self.font_manager.render(self.screen, f"Final Score: {self.player.score}", (WIDTH // 2, HEIGHT // 2), WHITE, "small", center=True)
             self.font_manager.render(self.screen, "Press ENTER for Title Screen", (WIDTH // 2, HEIGHT // 2 + 50), WHITE, "small", center=True)
 
-        pygame.display.flip()
+        self._present(hud_rects)
 
     def reset_game_stats(self):
         """Resets player score and lives, typically for a new game from start menu."""
@@ -935,22 +2717,375 @@ class Game:
         # Reset progression for a completely new game
         self.unlocked_levels = set([(1,1)]) 
         self.cleared_levels = set()
+        self._invalidate_overworld()
         self.overworld_cursor_node_key = (1,1)
         self.current_world_idx = 1
         self.current_level_idx = 1
 
 
     def run(self):
+        """Fixed-timestep loop: the simulation steps at FPS, rendering runs at up to max_fps."""
+        step = 1.0 / FPS
+        accumulator = 0.0
+        previous = time.perf_counter()
         while self.running:
+            now = time.perf_counter()
+            # Cap the catch-up so a long stall doesn't turn into a spiral of slow frames
+            accumulator += min(now - previous, step * MAX_SIM_STEPS)
+            previous = now
+
             self._handle_input()
-            self._update() 
-            self._draw()
-            self.clock.tick(FPS)
-        
+            while accumulator >= step:
+                self._update()
+                accumulator -= step
+            self._draw(accumulator / step)
+            self.clock.tick(self.max_fps)
+
+        if self.renderer is not None:
+            print(f"Dirty rects: {self.renderer.average_pixels():.0f} px/frame pushed on average "
+                  f"({WIDTH * HEIGHT} px for a full flip)")
+        if self._broadphase_steps:
+            print(f"Broadphase: {self._broadphase_total / self._broadphase_steps:.1f} candidate pairs tested per step")
+        if self.activation:
+            print(f"Activation: {self.activation_stats()}")
+        if self.level is not None and self.level.streamed:
+            print(f"Streaming: {self.level.stream_stats()}")
+        if self.prefetcher is not None:
+            print(f"Level prefetch: {self.prefetcher.stats()}")
         pygame.quit()
         sys.exit()
 
 
+def _synthetic_level(cols: int, rows: int) -> list[str]:
+    """A long level built by repeating the authored tile patterns, for benchmarks."""
+    pattern = [row.ljust(40) for row in worlds[1]["levels"][1]]
+    rows_out = []
+    for y in range(rows):
+        source = pattern[y % len(pattern)]
+        rows_out.append((source * (cols // len(source) + 1))[:cols])
+    return rows_out
+
+def benchmark_tile_renderers(frames=120):
+    """Times the per-tile pygame.draw path against the chunk and numpy backends."""
+    print(f"Tile layer draw time per frame ({frames} frames, scrolling)")
+    for label, size in (("800x600", (WIDTH, HEIGHT)), ("3840x2160", (3840, 2160))):
+        target = pygame.Surface(size)
+        tilemap = _synthetic_level(2000, size[1] // TILE_SIZE + 1)
+        backends = [("pygame.draw per tile", Level(tilemap), "draw_immediate"),
+                    ("chunks", Level(tilemap), "draw")]
+        if numpy is not None:
+            backends.append(("numpy surfarray", Level(tilemap, "numpy"), "draw"))
+        for name, level, method in backends:
+            level.bake_chunks()
+            draw = getattr(level, method)
+            start = time.perf_counter()
+            for frame in range(frames):
+                target.fill(SKY_BLUE)
+                draw(target, frame * 7)
+            elapsed_ms = (time.perf_counter() - start) * 1000 / frames
+            print(f"  {label:>9}  {name:<22} {elapsed_ms:8.3f} ms")
+
+def benchmark_display_modes(frames=120):
+    """Times a gameplay frame drawn natively at 4K against the logical frame plus upscaling."""
+    window = (3840, 2160)
+    scale = min(window[0] // WIDTH, window[1] // HEIGHT)
+    print(f"Gameplay frame cost at {window[0]}x{window[1]} ({frames} frames, scrolling)")
+    for label, target_size, scaled_size in (("native 4K", window, None),
+                                            (f"logical {WIDTH}x{HEIGHT} x{scale}", (WIDTH, HEIGHT), (WIDTH * scale, HEIGHT * scale))):
+        target = pygame.Surface(target_size)
+        scaled = pygame.Surface(scaled_size) if scaled_size else None
+        level = Level(_synthetic_level(2000, target_size[1] // TILE_SIZE + 1))
+        level.bake_chunks()
+        enemies = [Enemy(x, y, level) for x in range(0, level.cols, 6) for y in range(2, level.rows, 8)]
+        font_manager = FontManager()
+        draw_time = scale_time = 0.0
+        for frame in range(frames):
+            cam_x = frame * 7
+            start = time.perf_counter()
+            target.fill(SKY_BLUE)
+            level.draw(target, cam_x)
+            view = pygame.Rect(cam_x, 0, target_size[0], target_size[1])
+            for enemy in enemies:
+                if view.colliderect(enemy.rect):
+                    enemy.draw(target, cam_x)
+            font_manager.render(target, f"Score: {frame * 100}", (10, 10), WHITE)
+            mid = time.perf_counter()
+            if scaled is not None:
+                pygame.transform.scale(target, scaled_size, scaled)
+            draw_time += mid - start
+            scale_time += time.perf_counter() - mid
+        print(f"  {label:<24} draw {draw_time * 1000 / frames:8.3f} ms   upscale {scale_time * 1000 / frames:8.3f} ms")
+
+def benchmark_collision_queries(queries=200_000):
+    """Times Level.is_solid against the previous list-of-lists lookup."""
+    tilemap = _synthetic_level(2000, 20)
+
+    class ListLevel: # The previous storage and lookups, kept here for comparison
+        def __init__(self, rows):
+            self.tilemap = [list(row) for row in rows]
+            self.rows, self.cols = len(self.tilemap), len(self.tilemap[0])
+        def get_tile(self, grid_x, grid_y):
+            if 0 <= grid_y < self.rows and 0 <= grid_x < self.cols:
+                return self.tilemap[grid_y][grid_x]
+            return " "
+        def is_solid(self, grid_x, grid_y):
+            return self.get_tile(grid_x, grid_y) in ['S', 'Q', 'B']
+
+    cells = [((i * 7919) % 2000, (i * 104729) % 20) for i in range(queries)]
+    print(f"Level.is_solid, {queries} queries")
+    for name, level in (("list of lists", ListLevel(tilemap)), ("padded flag plane", Level(tilemap))):
+        is_solid = level.is_solid
+        start = time.perf_counter()
+        for grid_x, grid_y in cells:
+            is_solid(grid_x, grid_y)
+        elapsed_ns = (time.perf_counter() - start) * 1e9 / queries
+        print(f"  {name:<18} {elapsed_ns:7.1f} ns/query")
+
+def benchmark_entity_physics(frames=600):
+    """Times enemy movement with the swept solver against the previous overlap-and-push resolver."""
+    level = Level(_synthetic_level(2000, 20))
+
+    class OverlapEnemy(Enemy): # The previous resolver, kept here for comparison
+        def _move_axis(self, dx, dy, game=None):
+            self.rect.x += dx
+            self._resolve_collisions("x")
+            self.rect.y += dy
+            self._resolve_collisions("y")
+        def _resolve_collisions(self, axis, game=None):
+            for gy in range(self.rect.top // TILE_SIZE, (self.rect.bottom - 1) // TILE_SIZE + 1):
+                for gx in range(self.rect.left // TILE_SIZE, (self.rect.right - 1) // TILE_SIZE + 1):
+                    if self.level.is_solid(gx, gy):
+                        tile_rect = pygame.Rect(gx * TILE_SIZE, gy * TILE_SIZE, TILE_SIZE, TILE_SIZE)
+                        if self.rect.colliderect(tile_rect):
+                            if axis == "x":
+                                if self.vel_x > 0: self.rect.right = tile_rect.left
+                                elif self.vel_x < 0: self.rect.left = tile_rect.right
+                                if isinstance(self, Enemy): self.vel_x *= -1
+                                else: self.vel_x = 0
+                            else:
+                                if self.vel_y > 0:
+                                    self.rect.bottom = tile_rect.top
+                                    self._on_ground = True
+                                elif self.vel_y < 0:
+                                    self.rect.top = tile_rect.bottom
+                                self.vel_y = 0
+        def reindex(self):
+            pass
+
+    class SweptEnemy(Enemy):
+        def reindex(self):
+            pass
+
+    spawns = [(x, y) for x in range(2, level.cols - 2, 5) for y in range(1, level.rows - 2, 6)
+              if not level.is_solid(x, y)]
+    print(f"Enemy update, {len(spawns)} enemies x {frames} frames")
+    for name, enemy_class in (("overlap + Rect", OverlapEnemy), ("swept AABB", SweptEnemy)):
+        enemies = [enemy_class(x, y, level) for x, y in spawns]
+        start = time.perf_counter()
+        for _ in range(frames):
+            for enemy in enemies:
+                enemy.update()
+                if enemy.rect.top > level.height: # Fell through a gap, put it back
+                    enemy.respawn()
+        elapsed_ns = (time.perf_counter() - start) * 1e9 / (frames * len(spawns))
+        print(f"  {name:<18} {elapsed_ns:7.1f} ns/entity")
+
+def benchmark_enemy_engines(frames=300):
+    """Times a frame of enemy updates for the sprite group against the NumPy swarm."""
+    level = Level(_synthetic_level(2000, 20))
+    spawns = [(x, y) for x in range(2, level.cols - 2, 2) for y in range(1, level.rows - 2, 4)
+              if not level.is_solid(x, y)]
+    engines = [("sprite group", pygame.sprite.Group)]
+    if numpy is not None:
+        engines.append(("numpy swarm", EnemySwarm))
+    print(f"Enemy simulation, {len(spawns)} enemies x {frames} frames")
+    for name, engine in engines:
+        enemies = engine()
+        for x, y in spawns:
+            enemies.add(Enemy(x, y, level))
+        start = time.perf_counter()
+        for _ in range(frames):
+            enemies.update()
+        elapsed_ms = (time.perf_counter() - start) * 1000 / frames
+        print(f"  {name:<14} {elapsed_ms:8.3f} ms/frame   {len(enemies)} left")
+
+@contextlib.contextmanager
+def _benchmark_cache():
+    """A throwaway level cache directory for the level benchmarks.
+
+    Yields (cache_dir, keep). keep(level) returns level and closes it on exit,
+    since a file that is still memory-mapped can't be removed on every platform.
+    """
+    with tempfile.TemporaryDirectory() as cache_dir:
+        opened = []
+        def keep(level):
+            opened.append(level)
+            return level
+        try:
+            yield cache_dir, keep
+        finally:
+            for level in opened:
+                level.close()
+
+def benchmark_level_loading(cols=20_000, rows=20):
+    """Times building a level from strings against loading its compiled, memory-mapped form."""
+    tilemap = _synthetic_level(cols, rows)
+    print(f"Level load, {cols}x{rows} tiles")
+    with _benchmark_cache() as (cache_dir, keep):
+        start = time.perf_counter()
+        Level(tilemap)
+        print(f"  {'from strings':<22} {(time.perf_counter() - start) * 1000:8.2f} ms")
+        start = time.perf_counter()
+        keep(load_level(tilemap, cache_dir=cache_dir))
+        print(f"  {'compile + cache':<22} {(time.perf_counter() - start) * 1000:8.2f} ms")
+        path = os.path.join(cache_dir, level_cache_key(tilemap) + ".lvl")
+        start = time.perf_counter()
+        keep(load_compiled_level(path))
+        print(f"  {'mmap compiled':<22} {(time.perf_counter() - start) * 1000:8.2f} ms")
+        start = time.perf_counter()
+        level_cache_key(tilemap)
+        print(f"  {'content hash':<22} {(time.perf_counter() - start) * 1000:8.2f} ms")
+
+def benchmark_level_streaming(cols=100_000, rows=20):
+    """Scrolls the camera across levels of growing length, streamed by column chunks, against whole-level loads."""
+    target = pygame.Surface((WIDTH, HEIGHT))
+    reach = (WIDTH + ACTIVATION_SLEEP_MARGIN) // TILE_SIZE + 2 # Columns Game._stream_level asks for each side
+    print(f"Level streaming, camera scrolling {WIDTH} px per frame across the whole level")
+    with _benchmark_cache() as (cache_dir, keep):
+        for length in (cols // 100, cols // 10, cols):
+            # The repeated pattern has a player start every 40 columns, drop them so only the length grows
+            tilemap = [row.replace("P", " ") for row in _synthetic_level(length, rows)]
+            # Compile both forms first, so only loading is timed
+            path = os.path.join(cache_dir, level_cache_key(tilemap))
+            compile_level(tilemap, path + ".lvl")
+            compile_streamed_level(tilemap, path + ".stream")
+            start = time.perf_counter()
+            level = keep(load_compiled_level(path + ".lvl"))
+            load_ms = (time.perf_counter() - start) * 1000
+            print(f"  {length:>7} cols  whole     load {load_ms:6.2f} ms   planes {3 * len(level.tiles) / 2**20:7.2f} MB")
+
+            start = time.perf_counter()
+            level = keep(StreamedLevel(path + ".stream"))
+            load_ms = (time.perf_counter() - start) * 1000
+            frame_times = []
+            peak_bytes = 0
+            for cam_x in range(0, level.width - WIDTH + 1, WIDTH):
+                start = time.perf_counter()
+                column = (cam_x + WIDTH // 2) // TILE_SIZE
+                level.stream(column - reach, column + reach)
+                level.draw(target, cam_x)
+                frame_times.append(time.perf_counter() - start)
+                peak_bytes = max(peak_bytes, level.stream_stats()["resident_bytes"])
+            print(f"  {length:>7} cols  streamed  load {load_ms:6.2f} ms   peak resident {peak_bytes / 2**20:7.2f} MB   "
+                  f"frame {sum(frame_times) * 1000 / len(frame_times):6.3f} ms avg {max(frame_times) * 1000:6.3f} ms max   "
+                  f"{level.chunk_loads} chunk loads")
+
+def benchmark_level_prefetch(cols=20_000, rows=20, overworld_frames=90):
+    """Times entering an uncached level synchronously against taking it from the background prefetcher."""
+    tilemap = _synthetic_level(cols, rows)
+    print(f"Level entry, {cols}x{rows} tiles, not compiled yet")
+    with _benchmark_cache() as (cache_dir, keep):
+        start = time.perf_counter()
+        keep(load_level(tilemap, cache_dir=os.path.join(cache_dir, "sync")))
+        print(f"  {'synchronous':<22} {(time.perf_counter() - start) * 1000:8.2f} ms")
+
+        prefetcher = LevelPrefetcher(lambda key: load_level(tilemap, cache_dir=os.path.join(cache_dir, "prefetch")))
+        prefetcher.request((1, 1))
+        frame_times = []
+        target = pygame.Surface((WIDTH, HEIGHT))
+        for _ in range(overworld_frames): # The overworld screen showing while the worker builds
+            start = time.perf_counter()
+            target.fill(GRASS_GREEN)
+            frame_times.append(time.perf_counter() - start)
+            time.sleep(max(0.0, 1 / FPS - frame_times[-1]))
+        start = time.perf_counter()
+        keep(prefetcher.take((1, 1)))
+        print(f"  {'prefetched':<22} {(time.perf_counter() - start) * 1000:8.2f} ms   "
+              f"overworld frame {max(frame_times) * 1000:.2f} ms max while building   {prefetcher.stats()}")
+
+def benchmark_level_restart(cols=20_000, rows=20, mutation_counts=(10, 100, 1000), repeats=5):
+    """Times restarting a played level by reloading it against rolling back its tile journal."""
+    tilemap = _synthetic_level(cols, rows)
+    print(f"Level restart, {cols}x{rows} tiles")
+    with _benchmark_cache() as (cache_dir, keep):
+        keep(load_level(tilemap, cache_dir=cache_dir)) # Compile once so the reload below is the cached path
+        for label, reload in (("reparse strings", lambda: Level(tilemap)),
+                              ("reload compiled", lambda: keep(load_level(tilemap, cache_dir=cache_dir)))):
+            best = float("inf")
+            for _ in range(repeats):
+                start = time.perf_counter()
+                level = reload()
+                best = min(best, time.perf_counter() - start)
+            print(f"  {label:<22} {best * 1000:8.2f} ms")
+        level = Level(tilemap)
+        cells = [(x, y) for y in range(rows) for x in range(cols) if level.get_tile(x, y) in "BC?"]
+        for count in mutation_counts:
+            best = float("inf")
+            for _ in range(repeats):
+                for grid_x, grid_y in cells[:count]: # Break bricks, use ? blocks, collect coins
+                    level.set_tile(grid_x, grid_y, ".")
+                start = time.perf_counter()
+                level.rollback()
+                best = min(best, time.perf_counter() - start)
+            print(f"  {f'rollback {min(count, len(cells))} changes':<22} {best * 1000:8.2f} ms")
+
+BENCHMARKS = {
+    "collision": benchmark_collision_queries,
+    "tiles": benchmark_tile_renderers,
+    "display": benchmark_display_modes,
+    "physics": benchmark_entity_physics,
+    "enemies": benchmark_enemy_engines,
+    "load": benchmark_level_loading,
+    "stream": benchmark_level_streaming,
+    "prefetch": benchmark_level_prefetch,
+    "restart": benchmark_level_restart,
+}
+
+def _window_size(text):
+    try:
+        width, height = (int(part) for part in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got {text!r}")
+    return width, height
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Super Platformer Engine")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="present only changed screen regions instead of flipping every frame")
+    parser.add_argument("--tile-renderer", choices=TILE_RENDERERS, default="chunks",
+                        help="backend used to draw the level tiles")
+    parser.add_argument("--display", choices=DISPLAY_MODES, default="native",
+                        help="how the logical frame is presented to the window")
+    parser.add_argument("--window", type=_window_size, default=None, metavar="WxH",
+                        help="window size for --display integer, e.g. 3840x2160")
+    parser.add_argument("--max-fps", type=int, default=FPS, metavar="N",
+                        help=f"render rate cap (default {FPS}), 0 for uncapped; the simulation always runs at {FPS} Hz")
+    parser.add_argument("--enemy-engine", choices=ENEMY_ENGINES, default="sprites",
+                        help="simulate enemies as individual sprites or batched in NumPy arrays")
+    parser.add_argument("--physics", choices=sorted(PHYSICS_MODES), default="float",
+                        help="entity movement in float pixels or bit-exact 1/16 pixel fixed point")
+    parser.add_argument("--no-level-cache", dest="level_cache", action="store_false",
+                        help=f"build levels from their strings on every load instead of using {LEVEL_CACHE_DIR}")
+    parser.add_argument("--stream", dest="streaming", action="store_true",
+                        help=f"page levels in by {STREAM_CHUNK_COLS}-column chunks around the player instead of whole")
+    parser.add_argument("--no-prefetch", dest="prefetch", action="store_false",
+                        help="load levels when they are entered instead of building them ahead on a worker thread")
+    parser.add_argument("--no-activation", dest="activation", action="store_false",
+                        help="simulate every placed enemy and item from level start instead of near the camera")
+    parser.add_argument("--bench", choices=sorted(BENCHMARKS),
+                        help="run a benchmark instead of the game")
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    game = Game()
+    args = parse_args()
+    if args.bench:
+        pygame.init()
+        BENCHMARKS[args.bench]()
+        pygame.quit()
+        sys.exit()
+    game = Game(dirty_rects=args.dirty_rects, tile_renderer=args.tile_renderer,
+                display_mode=args.display, window_size=args.window, max_fps=args.max_fps,
+                enemy_engine=args.enemy_engine, activation=args.activation, physics=args.physics,
+                level_cache=args.level_cache, streaming=args.streaming, prefetch=args.prefetch)
     game.run()